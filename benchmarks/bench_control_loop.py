@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+
+"""
+End-to-end control loop benchmark for JAKAZU5 with N cameras.
+
+Runs a fixed-rate observe -> dummy policy -> act loop for a given duration and reports the
+achieved rate, deadline misses, per-stage latency percentiles, CPU time per thread and memory
+growth. The observe stage is also split into the time spent waiting for new camera frames
+(`frame_wait`, bound by the camera rate) and the rest (`observe_processing`). Results are
+written to a JSON file (stamped with the git commit) so runs can be compared across commits.
+
+The arm can be the simulated controller (`--backend sim`) or a real ZU5 (`--backend jkrc --ip ...`).
+Cameras are either synthetic (`--camera_backend sim`, frames generated in a background thread at
+`--camera_fps`) or Percipio devices (`--camera_backend percipio`).
+
+Example:
+
+```shell
+python benchmarks/bench_control_loop.py --fps 30 --num_cameras 3 --duration_s 30 --output bench_output.json
+python benchmarks/bench_control_loop.py --backend jkrc --ip 192.168.1.100 --camera_backend percipio --num_cameras 1
+```
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from jaka_zu5.config_jaka_zu5 import JAKAZU5Config  # noqa: E402
+from jaka_zu5.jaka_zu5 import JAKAZU5  # noqa: E402
+from zprobot_metrics import REGISTRY  # noqa: E402
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class SyntheticCamera:
+    """Camera producing random frames at `fps` in a background thread, stamped like PercipioCamera."""
+
+    def __init__(self, name: str, width: int, height: int, fps: float):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_timestamp: float | None = None
+
+        self._frames = np.random.randint(0, 255, (4, height, width, 3), dtype=np.uint8)
+        self._latest: np.ndarray | None = None
+        self._latest_ts: float | None = None
+        self._lock = Lock()
+        self._new_frame = Event()
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._thread is not None
+
+    def connect(self) -> None:
+        self._thread = Thread(target=self._loop, name=f"{self.name}_read_loop", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        i = 0
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            # copy like a real driver handing out a fresh buffer
+            frame = self._frames[i % len(self._frames)].copy()
+            with self._lock:
+                self._latest, self._latest_ts = frame, time.monotonic()
+            self._new_frame.set()
+            i += 1
+            next_t += 1.0 / self.fps
+            self._stop.wait(max(0.0, next_t - time.monotonic()))
+
+    def async_read(self, timeout_ms: float = 200) -> np.ndarray:
+        if not self._new_frame.wait(timeout_ms / 1000.0):
+            raise TimeoutError(f"{self.name} timed out")
+        with self._lock:
+            self._new_frame.clear()
+            self.frame_timestamp = self._latest_ts
+            return self._latest
+
+    def disconnect(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+def instrument_frame_waits(robot: JAKAZU5) -> dict[str, float]:
+    """
+    Times every camera (and camera group) read issued by `get_observation`. Returns a dict that
+    holds, per camera, the duration (s) of its latest read, i.e. its wait for a new frame.
+    """
+    waits: dict[str, float] = {}
+
+    def timed(name: str, read):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return read(*args, **kwargs)
+            finally:
+                waits[name] = time.perf_counter() - start
+
+        return wrapper
+
+    for name, source in {**robot.cameras, **robot.camera_groups}.items():
+        for method in ("async_read", "async_read_rgbd"):
+            if hasattr(source, method):
+                setattr(source, method, timed(name, getattr(source, method)))
+    return waits
+
+
+def make_camera_configs(args) -> dict[str, Any]:
+    if args.camera_backend != "percipio":
+        return {}
+    from percipio.configuration_percipio import PercipioCameraConfig
+
+    return {
+        f"cam{i}": PercipioCameraConfig(
+            serial_number_or_ip=args.camera_serials[i] if args.camera_serials else None,
+            fps=args.camera_fps,
+            width=args.width,
+            height=args.height,
+            acquisition_mode=args.acquisition_mode,
+            decode_workers=args.decode_workers,
+        )
+        for i in range(args.num_cameras)
+    }
+
+
+def thread_cpu_times() -> dict[str, float]:
+    """CPU time (user + system, s) of every live Python thread, keyed by thread name."""
+    times = {}
+    for thread in threading.enumerate():
+        try:
+            with open(f"/proc/self/task/{thread.native_id}/stat") as f:
+                # fields after the parenthesised command name, utime and stime are fields 14 and 15
+                fields = f.read().rsplit(")", 1)[1].split()
+            times[thread.name] = (int(fields[11]) + int(fields[12])) / CLK_TCK
+        except (OSError, TypeError):
+            continue
+    return times
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / 2**20
+
+
+def percentiles_ms(samples: np.ndarray) -> dict[str, float]:
+    ms = samples * 1e3
+    return {
+        "p50": float(np.percentile(ms, 50)),
+        "p95": float(np.percentile(ms, 95)),
+        "p99": float(np.percentile(ms, 99)),
+        "max": float(ms.max()),
+    }
+
+
+def dummy_policy(obs: dict[str, Any], t: float) -> dict[str, float]:
+    """Touches every image like a real preprocessor would, then returns a small sine motion."""
+    for key, value in obs.items():
+        if isinstance(value, np.ndarray):
+            value[::8, ::8].mean()
+    q = 0.05 * np.sin(2 * np.pi * 0.5 * t)
+    return {f"joint_{i}": float(q) for i in range(6)}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict[str, Any]:
+    config = JAKAZU5Config(
+        ip=args.ip,
+        backend=args.backend,
+        control_mode=args.control_mode,
+        cameras=make_camera_configs(args),
+    )
+    robot = JAKAZU5(config)
+    if args.camera_backend == "sim":
+        robot.cameras = {
+            f"cam{i}": SyntheticCamera(f"cam{i}", args.width, args.height, args.camera_fps)
+            for i in range(args.num_cameras)
+        }
+    robot.connect()
+    frame_waits = instrument_frame_waits(robot)
+
+    period_s = 1.0 / args.fps
+    n_steps = int(args.duration_s * args.fps)
+    n_warmup = int(args.warmup_s * args.fps)
+    stages = {
+        name: np.zeros(n_steps)
+        for name in ("observe", "frame_wait", "observe_processing", "policy", "act", "loop")
+    }
+    skew = np.zeros(n_steps)
+    starts = np.zeros(n_steps)
+    rss_samples = []
+
+    try:
+        for _ in range(n_warmup):
+            robot.send_action(dummy_policy(robot.get_observation(), 0.0))
+
+        cpu_start = thread_cpu_times()
+        rss_start = rss_mb()
+        t0 = time.perf_counter()
+        deadline = t0
+        for step in range(n_steps):
+            start = time.perf_counter()
+            frame_waits.clear()
+            obs = robot.get_observation()
+            t_obs = time.perf_counter()
+            action = dummy_policy(obs, start - t0)
+            t_policy = time.perf_counter()
+            robot.send_action(action)
+            end = time.perf_counter()
+
+            starts[step] = start
+            stages["observe"][step] = t_obs - start
+            # cameras are read concurrently, the observation waits for the slowest one
+            stages["frame_wait"][step] = max(frame_waits.values(), default=0.0)
+            stages["observe_processing"][step] = stages["observe"][step] - stages["frame_wait"][step]
+            stages["policy"][step] = t_policy - t_obs
+            stages["act"][step] = end - t_policy
+            stages["loop"][step] = end - start
+            skew[step] = obs.get("timestamp.skew", 0.0)
+            if step % max(1, int(args.fps)) == 0:
+                rss_samples.append(rss_mb())
+
+            deadline += period_s
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                # restart the schedule after a miss instead of catching up with back-to-back
+                # iterations, like ActionChunkExecutor
+                deadline = time.perf_counter()
+        elapsed = time.perf_counter() - t0
+        cpu_end = thread_cpu_times()
+        rss_end = rss_mb()
+    finally:
+        robot.disconnect()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "args": vars(args),
+        "target_hz": args.fps,
+        "achieved_hz": float((n_steps - 1) / (starts[-1] - starts[0])),
+        "deadline_misses": int(np.sum(stages["loop"] > period_s)),
+        "stage_latency_ms": {name: percentiles_ms(samples) for name, samples in stages.items()},
+        "observation_skew_ms": percentiles_ms(skew),
+        "cpu_percent_per_thread": {
+            name: 100.0 * (cpu_end[name] - cpu_start.get(name, 0.0)) / elapsed for name in sorted(cpu_end)
+        },
+        "memory_mb": {
+            "start": rss_start,
+            "end": rss_end,
+            "peak": max(rss_samples + [rss_end]),
+            "growth": rss_end - rss_start,
+        },
+        "metrics": REGISTRY.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="sim", choices=["sim", "jkrc"], help="Arm controller backend.")
+    parser.add_argument("--ip", default="127.0.0.1", help="Arm IP, for --backend jkrc.")
+    parser.add_argument("--control_mode", default="servo", choices=["servo", "joint_move"])
+    parser.add_argument("--camera_backend", default="sim", choices=["sim", "percipio"])
+    parser.add_argument(
+        "--acquisition_mode",
+        default="software_trigger",
+        choices=["continuous", "software_trigger", "hardware_trigger"],
+        help="PercipioCamera acquisition mode, for --camera_backend percipio.",
+    )
+    parser.add_argument(
+        "--decode_workers",
+        type=int,
+        default=1,
+        help="PercipioCamera decode/postprocess threads behind the acquisition thread, for --camera_backend percipio.",
+    )
+    parser.add_argument("--num_cameras", type=int, default=2)
+    parser.add_argument(
+        "--camera_serials",
+        nargs="*",
+        default=None,
+        help="Serial numbers or IPs of the Percipio cameras, one per camera, needed with several cameras.",
+    )
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--camera_fps", type=float, default=30.0)
+    parser.add_argument("--fps", type=float, default=30.0, help="Control loop rate.")
+    parser.add_argument("--duration_s", type=float, default=20.0)
+    parser.add_argument("--warmup_s", type=float, default=1.0)
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    results = run(args)
+    summary = {k: results[k] for k in ("achieved_hz", "deadline_misses", "stage_latency_ms", "memory_mb")}
+    print(json.dumps(summary, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2, default=str))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks the per-stage cost of the Percipio depth filter chain (percipio/depth_filters.py).
+
+By default the numpy stages ("temporal", "hole_fill") run on synthetic depth frames, a tilted
+plane with a moving box, sensor noise and holes, so no camera is needed. With `--camera` the whole
+chain, including the SDK "speckle" stage, runs in the background pipeline of a connected Percipio
+camera. Stage times are read from the `percipio.depth_filter_<name>_ms` histograms.
+
+Example:
+
+```shell
+python benchmarks/bench_depth_filters.py --width 640 --height 480 --frames 300
+python benchmarks/bench_depth_filters.py --camera 207000001234 --filters speckle temporal hole_fill
+```
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from percipio.depth_filters import DEPTH_FILTERS, DepthFilterChain, HoleFillFilter, TemporalFilter  # noqa: E402
+from zprobot_metrics import REGISTRY  # noqa: E402
+
+
+def synthetic_frames(width: int, height: int, n: int, hole_ratio: float, seed: int = 0):
+    """Yields uint16 (h, w, 1) depth frames in mm: plane at 0.8-1.2 m, a box moving across it."""
+    rng = np.random.default_rng(seed)
+    v, u = np.mgrid[0:height, 0:width]
+    plane = 800.0 + 400.0 * v / height
+    box_w, box_h = width // 5, height // 5
+    for i in range(n):
+        depth = plane + rng.normal(0.0, 3.0, plane.shape)
+        x = (i * 4) % (width - box_w)
+        depth[height // 3 : height // 3 + box_h, x : x + box_w] = 500.0
+        depth[rng.random(plane.shape) < hole_ratio] = 0
+        yield depth.astype(np.uint16)[..., None]
+
+
+def run_synthetic(args) -> None:
+    stages = {
+        "temporal": lambda: TemporalFilter(args.temporal_alpha, args.temporal_delta_mm),
+        "hole_fill": lambda: HoleFillFilter(args.hole_fill_radius),
+    }
+    skipped = [name for name in args.filters if name not in stages]
+    if skipped:
+        print(f"Skipping {skipped}, they need a camera (--camera).")
+    chain = DepthFilterChain([(name, stages[name]()) for name in args.filters if name in stages])
+
+    frames = list(synthetic_frames(args.width, args.height, args.frames, args.hole_ratio))
+    start = time.perf_counter()
+    for i, depth in enumerate(frames):
+        chain(None, depth, i)
+    total_ms = (time.perf_counter() - start) * 1e3
+    print(f"{len(frames)} frames of {args.width}x{args.height}, {total_ms / len(frames):.3f} ms per frame")
+
+
+def run_camera(args) -> None:
+    from percipio.camera_percipio import PercipioCamera
+    from percipio.configuration_percipio import PercipioCameraConfig
+
+    camera = PercipioCamera(
+        PercipioCameraConfig(
+            serial_number_or_ip=args.camera,
+            width=args.width,
+            height=args.height,
+            use_depth=True,
+            acquisition_mode="continuous",
+            depth_filters=args.filters,
+            temporal_alpha=args.temporal_alpha,
+            temporal_delta_mm=args.temporal_delta_mm,
+            hole_fill_radius=args.hole_fill_radius,
+        )
+    )
+    camera.connect()
+    try:
+        for _ in range(args.frames):
+            camera.async_read_depth(timeout_ms=1000)
+    finally:
+        camera.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", default=None, help="Serial number or IP of a Percipio camera, else synthetic frames.")
+    parser.add_argument("--filters", nargs="+", default=list(DEPTH_FILTERS), choices=DEPTH_FILTERS)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--hole_ratio", type=float, default=0.05, help="Share of missing pixels, synthetic frames.")
+    parser.add_argument("--temporal_alpha", type=float, default=0.4)
+    parser.add_argument("--temporal_delta_mm", type=float, default=20.0)
+    parser.add_argument("--hole_fill_radius", type=int, default=2)
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    if args.camera is None:
+        run_synthetic(args)
+    else:
+        run_camera(args)
+
+    histograms = REGISTRY.snapshot()["histograms"]
+    stage_ms = {
+        name: {k: histograms[key][k] for k in ("count", "mean_ms", "p50_ms", "p95_ms", "max_ms")}
+        for name in args.filters
+        if (key := f"percipio.depth_filter_{name}_ms") in histograms and histograms[key]["count"]
+    }
+    print(json.dumps(stage_ms, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(stage_ms, indent=2))
+
+
+if __name__ == "__main__":
+    main()
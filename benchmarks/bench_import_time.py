@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+"""
+Measures the cold import time of the driver modules and whether importing them loads a native SDK.
+
+Every module is imported in a fresh interpreter `--repeats` times. The reported time is the median
+wall time of the import statement alone (interpreter start-up excluded), along with the list of
+native SDK modules (`pcammls`, `jkrc`) that ended up in `sys.modules`.
+
+Example:
+
+```shell
+python benchmarks/bench_import_time.py
+python benchmarks/bench_import_time.py --modules percipio zprobot_find_cameras --repeats 20
+```
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_MODULES = ["percipio", "percipio.camera_percipio", "jaka_zu5.jaka_zu5", "zprobot_find_cameras"]
+SDK_MODULES = ["pcammls", "_pcammls", "jkrc"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_s": elapsed, "sdks": [m for m in {sdks!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeats: int) -> dict:
+    times = []
+    sdks = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, sdks=SDK_MODULES)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if out.returncode != 0:
+            return {"module": module, "error": out.stderr.strip().splitlines()[-1]}
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(result["import_s"])
+        sdks = result["sdks"]
+    return {
+        "module": module,
+        "median_ms": statistics.median(times) * 1e3,
+        "min_ms": min(times) * 1e3,
+        "sdks_loaded": sdks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeats) for module in args.modules]
+    for r in results:
+        if "error" in r:
+            print(f"{r['module']:<28} failed: {r['error']}")
+        else:
+            print(f"{r['module']:<28} {r['median_ms']:8.1f} ms (min {r['min_ms']:.1f})  SDKs loaded: {r['sdks_loaded']}")
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
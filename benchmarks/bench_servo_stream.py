@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks how fast `JAKAZU5.send_action` can stream joint targets, against the simulated `jkrc`
+controller (jaka_zu5/sim_jkrc.py) so no arm is needed.
+
+The simulated controller answers every call after a configurable network latency. `joint_move`
+with is_block=True additionally blocks until the commanded motion has finished at the given
+speed, like the real controller does.
+
+Example:
+
+```shell
+python benchmarks/bench_servo_stream.py --control_mode servo --hz 100 --duration_s 10
+python benchmarks/bench_servo_stream.py --control_mode joint_move --hz 30 --duration_s 10
+```
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from jaka_zu5.config_jaka_zu5 import JAKAZU5Config  # noqa: E402
+from jaka_zu5.jaka_zu5 import JAKAZU5  # noqa: E402
+
+
+def run(control_mode: str, hz: float, duration_s: float, latency_s: float, jitter_s: float) -> dict:
+    robot = JAKAZU5(
+        JAKAZU5Config(
+            ip="127.0.0.1",
+            backend="sim",
+            control_mode=control_mode,
+            sim_latency_s=latency_s,
+            sim_jitter_s=jitter_s,
+        )
+    )
+    robot.connect()
+
+    period_s = 1.0 / hz
+    n_steps = int(duration_s * hz)
+    starts = np.zeros(n_steps)
+    cmd_latency = np.zeros(n_steps)
+
+    t0 = time.perf_counter()
+    deadline = t0
+    for step in range(n_steps):
+        start = time.perf_counter()
+        # 0.1 rad amplitude sine on every joint, 0.5 Hz
+        q = 0.1 * math.sin(2 * math.pi * 0.5 * (start - t0))
+        robot.send_action({f"joint_{i}": q for i in range(6)})
+        end = time.perf_counter()
+
+        starts[step] = start
+        cmd_latency[step] = end - start
+
+        deadline += period_s
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    robot.disconnect()
+
+    periods = np.diff(starts)
+    jitter_ms = np.abs(periods - period_s) * 1e3
+    return {
+        "control_mode": control_mode,
+        "target_hz": hz,
+        "achieved_hz": float((n_steps - 1) / (starts[-1] - starts[0])),
+        "deadline_misses": int(np.sum(cmd_latency > period_s)),
+        "jitter_ms": {
+            "mean": float(jitter_ms.mean()),
+            "std": float(periods.std() * 1e3),
+            "p99": float(np.percentile(jitter_ms, 99)),
+            "max": float(jitter_ms.max()),
+        },
+        "command_latency_ms": {
+            "p50": float(np.percentile(cmd_latency, 50) * 1e3),
+            "p99": float(np.percentile(cmd_latency, 99) * 1e3),
+            "max": float(cmd_latency.max() * 1e3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--control_mode", default="servo", choices=["servo", "joint_move"])
+    parser.add_argument("--hz", type=float, default=100.0, help="Target command rate.")
+    parser.add_argument("--duration_s", type=float, default=10.0)
+    parser.add_argument("--latency_s", type=float, default=0.001, help="Simulated controller round trip.")
+    parser.add_argument("--jitter_s", type=float, default=0.0005, help="Simulated round trip jitter.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    results = run(args.control_mode, args.hz, args.duration_s, args.latency_s, args.jitter_s)
+    print(json.dumps(results, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
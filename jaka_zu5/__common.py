@@ -1,46 +1,56 @@
-# -*- coding: utf-8
-import os
-import sys
-import ctypes
-
-import platform
-
-# 获取当前系统名称
-__system = platform.system()
-
-if __system == "Windows":
-    print("当前系统为Windows")
-    def init_env():
-        base_dir = os.path.abspath('.')
-        print('base dir', base_dir)
-
-        # 指定 Windows 动态库查找路径
-        syspath = os.path.join(base_dir, r'out\python3\Release')
-        sys.path.append(syspath)
-
-        # 指定 Windows Python jkzuc模块查找路径
-        env_path = os.path.join(base_dir, r'out\shared\Release')
-        path_env = os.environ.get('PATH')
-        path_env = env_path + ';' + path_env
-        os.environ['PATH'] = path_env
-        print('env: {}'.format(os.environ['PATH']))
-elif __system == "Linux":
-    print("当前系统为Linux")
-    def init_env():
-        base_dir = os.path.abspath('.')
-
-        # 加载 Linux 动态库 libjakaAPI.so
-        env_path = os.path.join(base_dir, r'jaka_zu5/libjakaAPI.so')
-        ctypes.CDLL(env_path)
-
-        # 加载 Linux Python jkzuc模块查找路径
-        syspath = os.path.join(base_dir, r'jaka_zu5')
-        sys.path.append(syspath)
-        # print('SYS PATH: {}\n {}'.format(sys.path, syspath))
-        # print('LD_LIBRARY_PATH: {}'.format(os.environ['LD_LIBRARY_PATH']))
-else:
-    print("未知系统")
-
-
-if __name__ == '__main__':
-    init_env()
+# -*- coding: utf-8
+import os
+import sys
+import ctypes
+import logging
+from functools import lru_cache
+
+import platform
+
+logger = logging.getLogger(__name__)
+
+# 获取当前系统名称
+__system = platform.system()
+
+# SDK 文件相对于本包目录查找，与当前工作目录无关
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+if __system == "Windows":
+    # 只在第一次调用时加载，之后直接返回
+    @lru_cache(maxsize=None)
+    def init_env():
+        base_dir = PACKAGE_DIR
+        logger.debug('base dir {}'.format(base_dir))
+
+        # 指定 Windows 动态库查找路径
+        syspath = os.path.join(base_dir, r'out\python3\Release')
+        sys.path.append(syspath)
+
+        # 指定 Windows Python jkzuc模块查找路径
+        env_path = os.path.join(base_dir, r'out\shared\Release')
+        path_env = os.environ.get('PATH')
+        path_env = env_path + ';' + path_env
+        os.environ['PATH'] = path_env
+        logger.debug('env: {}'.format(os.environ['PATH']))
+elif __system == "Linux":
+    # 只在第一次调用时加载，之后直接返回
+    @lru_cache(maxsize=None)
+    def init_env():
+        base_dir = PACKAGE_DIR
+
+        # 加载 Linux 动态库 libjakaAPI.so
+        env_path = os.path.join(base_dir, 'libjakaAPI.so')
+        ctypes.CDLL(env_path)
+
+        # 加载 Linux Python jkzuc模块查找路径
+        syspath = base_dir
+        if syspath not in sys.path:
+            sys.path.append(syspath)
+        logger.debug('loaded {}'.format(env_path))
+else:
+    def init_env():
+        raise OSError("未知系统: {}".format(__system))
+
+
+if __name__ == '__main__':
+    init_env()
@@ -0,0 +1,152 @@
+"""
+Provides ActionChunkExecutor, which streams temporally ensembled action chunks to the arm.
+"""
+
+import logging
+import time
+from collections.abc import Callable
+from threading import Event, Lock, Thread
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+
+class ActionChunkExecutor:
+    """
+    Blends overlapping k-step action chunks and streams the result at the servo rate.
+
+    Chunks from ACT/SmolVLA style policies are stored in a fixed-size buffer together with the
+    time `t0` of their first action. On every tick the executor samples each chunk that covers
+    the current time (linearly interpolating between its actions) and averages them with the
+    temporal ensemble weights from ACT, `w_i = exp(-m * i)`, where `i` is the age of the chunk in
+    action steps relative to the oldest covering chunk, so older predictions weigh more.
+
+    Args:
+        send_fn: Called with the blended joint target (list of floats) on every tick.
+        period_s: Tick period, i.e. the servo command period.
+        chunk_dt_s: Time between two consecutive actions of a chunk.
+        ensemble_coeff: The `m` coefficient of the ensemble weights.
+        max_chunks: Number of chunks kept, submitting more overwrites the oldest one.
+        max_chunk_len: Maximum number of actions per chunk.
+        num_joints: Action dimension.
+    """
+
+    def __init__(
+        self,
+        send_fn: Callable[[list[float]], Any],
+        period_s: float,
+        chunk_dt_s: float,
+        ensemble_coeff: float = 0.01,
+        max_chunks: int = 8,
+        max_chunk_len: int = 100,
+        num_joints: int = 6,
+    ):
+        self.send_fn = send_fn
+        self.period_s = period_s
+        self.chunk_dt_s = chunk_dt_s
+        self.ensemble_coeff = ensemble_coeff
+        self.max_chunks = max_chunks
+        self.max_chunk_len = max_chunk_len
+        self.num_joints = num_joints
+
+        self.chunks = np.zeros((max_chunks, max_chunk_len, num_joints), dtype=np.float64)
+        self.t0 = np.zeros(max_chunks, dtype=np.float64)
+        self.lengths = np.zeros(max_chunks, dtype=np.int64)
+        self._slots = np.arange(max_chunks)
+        self._num_submitted = 0
+        self._lock = Lock()
+
+        self.thread: Thread | None = None
+        self.stop_event: Event | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def submit(self, chunk: NDArray[Any], t0: float) -> None:
+        """Stores a `(k, num_joints)` chunk whose first action is due at `t0` (time.monotonic())."""
+        if chunk.ndim != 2 or chunk.shape[1] != self.num_joints or not 0 < chunk.shape[0] <= self.max_chunk_len:
+            raise ValueError(
+                f"Expected an action chunk of shape (k<={self.max_chunk_len}, {self.num_joints}), got {chunk.shape}."
+            )
+        with self._lock:
+            slot = self._num_submitted % self.max_chunks
+            self.chunks[slot, : len(chunk)] = chunk
+            self.t0[slot] = t0
+            self.lengths[slot] = len(chunk)
+            self._num_submitted += 1
+
+    def clear(self) -> None:
+        """Drops all pending chunks, the arm then holds its last target."""
+        with self._lock:
+            self.lengths[:] = 0
+
+    def blend(self, t: float) -> NDArray[np.float64] | None:
+        """Returns the ensembled target at time `t`, or None if no chunk covers `t`."""
+        with self._lock:
+            # fractional action index of `t` inside every chunk
+            s = (t - self.t0) / self.chunk_dt_s
+            last = self.lengths - 1
+            valid = (self.lengths > 0) & (s >= 0) & (s <= last)
+            if not valid.any():
+                return None
+
+            i0 = np.clip(np.floor(s).astype(np.int64), 0, np.maximum(last, 0))
+            i1 = np.minimum(i0 + 1, np.maximum(last, 0))
+            frac = (s - i0)[:, None]
+            actions = (1.0 - frac) * self.chunks[self._slots, i0] + frac * self.chunks[self._slots, i1]
+
+            age = np.where(valid, self.t0 - self.t0[valid].min(), 0.0) / self.chunk_dt_s
+            weights = np.exp(-self.ensemble_coeff * age) * valid
+
+        return weights @ actions / weights.sum()
+
+    def _run_loop(self) -> None:
+        """
+        Internal loop run by the executor thread.
+
+        Every `period_s` blends the buffered chunks at the current time and sends the result.
+        Nothing is sent while no chunk covers the current time.
+        """
+        if self.stop_event is None:
+            raise RuntimeError("ActionChunkExecutor: stop_event is not initialized before starting run loop.")
+
+        next_t = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                target = self.blend(time.monotonic())
+                if target is not None:
+                    self.send_fn(target.tolist())
+            except Exception as e:
+                logger.warning(f"Error streaming action chunk: {e}")
+
+            next_t += self.period_s
+            remaining = next_t - time.monotonic()
+            if remaining > 0:
+                self.stop_event.wait(remaining)
+            else:
+                next_t = time.monotonic()
+
+    def start(self) -> None:
+        """Starts the executor thread if it is not running."""
+        if self.is_running:
+            return
+        self.stop_event = Event()
+        self.thread = Thread(target=self._run_loop, args=(), name="ActionChunkExecutor_run_loop")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Signals the executor thread to stop and waits for it to join."""
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+
+        self.thread = None
+        self.stop_event = None
+        self.clear()
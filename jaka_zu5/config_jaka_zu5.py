@@ -1,3 +1,4 @@
+import math
 from dataclasses import dataclass, field
 
 from lerobot.cameras.configs  import CameraConfig
@@ -11,4 +12,116 @@ class JAKAZU5Config(RobotConfig):
     #IP to connect to the arm
     ip: str
     # cameras
-    cameras: dict[str, CameraConfig] = field(default_factory=dict)
\ No newline at end of file
+    cameras: dict[str, CameraConfig] = field(default_factory=dict)
+    # Percipio cameras captured together as one synchronized observation source, group name ->
+    # camera names (see percipio.camera_group). Members need the same trigger acquisition_mode.
+    camera_groups: dict[str, list[str]] = field(default_factory=dict)
+
+    # Controller backend: "jkrc" drives a real arm through the native SDK, "sim" uses the
+    # in-process simulated controller from jaka_zu5/sim_jkrc.py (no hardware needed)
+    backend: str = "jkrc"
+    # Simulated controller parameters, only used with backend="sim"
+    sim_latency_s: float = 0.001
+    sim_jitter_s: float = 0.0005
+    sim_time_constant_s: float = 0.05
+    sim_error_rate: float = 0.0
+
+    # How joint targets are sent to the arm:
+    #   "servo":      non-blocking servo_j streaming, one target per control step
+    #   "joint_move": blocking point-to-point joint_move, waits for the arm to stop
+    control_mode: str = "servo"
+    # Time the controller takes to reach each servo_j target (s). The ZU5 controller
+    # interpolates on an 8 ms cycle, so this is rounded to a multiple of 8 ms. None follows the
+    # command rate: each target is reached over the time since the previous command, so a 30 Hz
+    # policy moves continuously instead of reaching every target in 8 ms and waiting. A fixed
+    # value should match the policy period. Action chunks are streamed at this period (8 ms for None).
+    servo_period_s: float | None = None
+    # Cutoff of the controller side joint low-pass filter in servo mode (Hz), 0 disables it
+    servo_lpf_hz: float = 0.0
+    # Joint speed used by control_mode="joint_move" (rad/s)
+    joint_move_speed: float = 0.2
+
+    # Rate at which the background state thread polls joint positions (Hz)
+    state_poll_hz: float = 250.0
+    # Number of timestamped joint samples kept in the state ring buffer
+    state_buffer_size: int = 1024
+
+    # Add the flange pose computed by forward kinematics (ee.x/y/z in m, ee.qx/qy/qz/qw) to the
+    # observation features. connect() checks the kinematics against the controller's kine_forward.
+    ee_pose_features: bool = False
+
+    # Safety filter between the policy and the arm (see jaka_zu5/safety_filter.py). Every joint
+    # target is clipped to the limits below before it is sent, in both single-step and chunk mode.
+    safety_filter: bool = True
+    # Joint position limits (rad), defaults are the ZU5 joint ranges
+    joint_position_min: list[float] = field(
+        default_factory=lambda: [math.radians(d) for d in (-270, -85, -175, -85, -270, -270)]
+    )
+    joint_position_max: list[float] = field(
+        default_factory=lambda: [math.radians(d) for d in (270, 265, 175, 265, 270, 270)]
+    )
+    # Per-joint derivative limits of the target stream, a single value applies to all joints.
+    # They are ignored with control_mode="joint_move", where the controller plans the motion.
+    max_joint_velocity: float | list[float] = 3.14  # rad/s
+    max_joint_acceleration: float | list[float] = 10.0  # rad/s^2
+    max_joint_jerk: float | list[float] = 500.0  # rad/s^3
+    # Maximum distance of a target from the measured joint positions (rad)
+    max_step_from_measured: float | list[float] = 0.2
+
+    # Action chunk execution (`send_action_chunk`), servo mode only
+    # Rate at which the actions inside a policy chunk are meant to be executed (Hz)
+    chunk_fps: float = 30.0
+    # `m` in the ACT temporal ensemble weights w_i = exp(-m * i)
+    temporal_ensemble_coeff: float = 0.01
+    # Number of overlapping chunks kept for blending
+    max_chunks: int = 8
+    # Maximum number of actions per chunk
+    max_chunk_len: int = 100
+
+    # Optional periodic dump of the in-process metrics (see zprobot_metrics), None disables it
+    metrics_dump_path: str | None = None
+    metrics_dump_interval_s: float = 10.0
+    # "json" or "prometheus" (text exposition format)
+    metrics_dump_format: str = "json"
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+
+        if self.backend not in ("jkrc", "sim"):
+            raise ValueError(f"`backend` is expected to be 'jkrc' or 'sim', but {self.backend} is provided.")
+
+        if self.control_mode not in ("servo", "joint_move"):
+            raise ValueError(
+                f"`control_mode` is expected to be 'servo' or 'joint_move', but {self.control_mode} is provided."
+            )
+
+        if self.servo_period_s is not None and self.servo_period_s <= 0:
+            raise ValueError(f"`servo_period_s` must be positive, but {self.servo_period_s} is provided.")
+
+        if self.metrics_dump_format not in ("json", "prometheus"):
+            raise ValueError(
+                f"`metrics_dump_format` is expected to be 'json' or 'prometheus', but {self.metrics_dump_format} is provided."
+            )
+
+        if self.chunk_fps <= 0:
+            raise ValueError(f"`chunk_fps` must be positive, but {self.chunk_fps} is provided.")
+
+        for name in ("joint_position_min", "joint_position_max"):
+            if len(getattr(self, name)) != 6:
+                raise ValueError(f"`{name}` must have 6 values, but {getattr(self, name)} is provided.")
+        if any(lo >= hi for lo, hi in zip(self.joint_position_min, self.joint_position_max, strict=True)):
+            raise ValueError(
+                f"`joint_position_min` must be below `joint_position_max`, but {self.joint_position_min} and "
+                f"{self.joint_position_max} are provided."
+            )
+
+        grouped = [name for names in self.camera_groups.values() for name in names]
+        if any(name not in self.cameras for name in grouped):
+            raise ValueError(
+                f"`camera_groups` may only contain configured cameras {list(self.cameras)}, but {self.camera_groups} is provided."
+            )
+        if len(grouped) != len(set(grouped)):
+            raise ValueError(f"A camera can be in one of `camera_groups` only, but {self.camera_groups} is provided.")
+
+        if self.state_poll_hz <= 0:
+            raise ValueError(f"`state_poll_hz` must be positive, but {self.state_poll_hz} is provided.")
@@ -5,45 +5,144 @@ from lerobot.cameras import CameraConfig, make_cameras_from_configs
 from lerobot.robots import RobotConfig, Robot
 from lerobot.utils.errors import DeviceNotConnectedError,DeviceAlreadyConnectedError
 
-import __common
+from jaka_zu5 import __common
 
+from jaka_zu5.chunk_executor import ActionChunkExecutor
 from jaka_zu5.config_jaka_zu5 import JAKAZU5Config
+from jaka_zu5.joint_state import JointStateBuffer
+from jaka_zu5.kinematics import ee_pose, kine_forward_error
+from jaka_zu5.safety_filter import LIMITS, JointSafetyFilter
+from jaka_zu5 import sim_jkrc
+from zprobot_metrics import REGISTRY, MetricsDumper
 
 import numpy as np
+from numpy.typing import NDArray
 
 import logging
+import math
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from functools import cached_property
+from threading import Event, Thread
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Interpolation cycle of the ZU5 controller (s)
+SERVO_CYCLE_S = 0.008
+# Longest time a servo_j target is interpolated over when following the command rate (s), a
+# command after a longer pause is reached in one cycle instead
+SERVO_FOLLOW_MAX_S = 0.5
+# jkrc move modes: 0 absolute, 1 incremental
+ABS = 0
+INCR = 1
+
+EE_POSE_KEYS = ("ee.x", "ee.y", "ee.z", "ee.qx", "ee.qy", "ee.qz", "ee.qw")
+# Largest disagreement between the local forward kinematics and `rc.kine_forward` accepted at
+# connect with `ee_pose_features`
+KINEMATICS_TOLERANCE_M = 0.001
+KINEMATICS_TOLERANCE_RAD = math.radians(0.5)
+
+# hot path metrics, see zprobot_metrics
+_JOINT_READ_MS = REGISTRY.histogram("jaka_zu5.joint_read_ms")
+_JOINT_COMMAND_MS = REGISTRY.histogram("jaka_zu5.joint_command_ms")
+_OBSERVATION_MS = REGISTRY.histogram("jaka_zu5.get_observation_ms")
+_JOINT_READ_ERRORS = REGISTRY.counter("jaka_zu5.joint_read_errors")
+_JOINT_COMMAND_ERRORS = REGISTRY.counter("jaka_zu5.joint_command_errors")
+_SAFETY_CLIPS = [REGISTRY.counter(f"jaka_zu5.safety_clips.{limit}") for limit in LIMITS]
+
+
+def _import_jkrc():
+    """Loads the JAKA native library and returns the `jkrc` module."""
+    __common.init_env()
+    import jkrc
+
+    return jkrc
+
+
 class JAKAZU5(Robot):
     config_class = JAKAZU5Config
     name = "jaka_zu5"
 
     def __init__(self, config: JAKAZU5Config):
         super().__init__(config)
-        
+        self.config = config
+
         self.cameras = make_cameras_from_configs(config.cameras)
+        # cameras captured together, each group is one observation source with a single timestamp
+        self.camera_groups = {}
+        if config.camera_groups:
+            # imported here so arm-only use does not load percipio and OpenCV
+            from percipio.camera_group import PercipioCameraGroup
+
+            self.camera_groups = {
+                group: PercipioCameraGroup({name: self.cameras[name] for name in names})
+                for group, names in config.camera_groups.items()
+            }
+        self._grouped_cameras = {name for names in config.camera_groups.values() for name in names}
 
         # RTDE fields (hardware side)
         self.robot_ip = config.ip
 
         # servoJ streaming parameters
-        # Use a finite period so the controller gracefully holds until next update
-        # and does not require a perfect 125 Hz stream from Python/HTTP loop
-        self.acc = 0.5
-        self.speed = 0.5
-        self.servoj_t = 1.0 / 500
-        self.servoj_lookahead = 0.2
-        self.servoj_gain = 100
-        #initial jaka arm environment
-        __common.init_env()
-        import jkrc
+        # Each servo_j target is reached over `servo_step_num` controller cycles, so the
+        # controller holds smoothly between updates instead of requiring a perfect stream.
+        # Without a fixed servo_period_s, single targets use the time since the previous command.
+        self.control_mode = config.control_mode
+        self.servo_step_num = max(1, round((config.servo_period_s or SERVO_CYCLE_S) / SERVO_CYCLE_S))
+        self._last_command_t: float | None = None
 
         self.rc = None
 
+        # background joint state polling
+        self.joint_state = JointStateBuffer(config.state_buffer_size)
+        self.state_thread: Thread | None = None
+        self.state_stop_event: Event | None = None
+
+        # waits on all cameras concurrently in get_observation
+        self.obs_executor: ThreadPoolExecutor | None = None
+
+        self.metrics_dumper: MetricsDumper | None = None
+        if config.metrics_dump_path is not None:
+            self.metrics_dumper = MetricsDumper(
+                config.metrics_dump_path, config.metrics_dump_interval_s, config.metrics_dump_format
+            )
+
+        # bounds every joint target before it reaches the controller. Chunks are filtered in the
+        # caller's thread while the executor streams, so they get their own filter instance.
+        self.safety_filter: JointSafetyFilter | None = None
+        self.chunk_safety_filter: JointSafetyFilter | None = None
+        if config.safety_filter:
+            self.safety_filter = self._make_safety_filter()
+            self.chunk_safety_filter = self._make_safety_filter()
+            self._clip_totals = np.zeros(len(LIMITS), dtype=np.int64)
+            self._chunk_buffer = np.empty((config.max_chunk_len, len(self._motors_ft)))
+
+        # streams blended action chunks at the servo rate
+        self.chunk_executor = ActionChunkExecutor(
+            self._send_joint_command,
+            period_s=self.servo_step_num * SERVO_CYCLE_S,
+            chunk_dt_s=1.0 / config.chunk_fps,
+            ensemble_coeff=config.temporal_ensemble_coeff,
+            max_chunks=config.max_chunks,
+            max_chunk_len=config.max_chunk_len,
+            num_joints=len(self._motors_ft),
+        )
+
+    def _make_safety_filter(self) -> JointSafetyFilter:
+        servo = self.control_mode == "servo"
+        return JointSafetyFilter(
+            dt=self.servo_step_num * SERVO_CYCLE_S,
+            q_min=self.config.joint_position_min,
+            q_max=self.config.joint_position_max,
+            # joint_move targets are not a stream, the controller plans the motion itself
+            v_max=self.config.max_joint_velocity if servo else np.inf,
+            a_max=self.config.max_joint_acceleration if servo else np.inf,
+            j_max=self.config.max_joint_jerk if servo else np.inf,
+            max_step=self.config.max_step_from_measured,
+            num_joints=len(self._motors_ft),
+        )
+
     @property
     def _motors_ft(self) -> dict[str, type]:
         return {
@@ -55,15 +154,29 @@ class JAKAZU5(Robot):
             "joint_5": float,
         }
 
+    @property
+    def _ee_ft(self) -> dict[str, type]:
+        if not self.config.ee_pose_features:
+            return {}
+        return dict.fromkeys(EE_POSE_KEYS, float)
+
     @property
     def _cameras_ft(self) -> dict[str, tuple]:
-        return {
-            cam: (self.cameras[cam].height, self.cameras[cam].width, 3) for cam in self.cameras
+        features = {
+            cam: getattr(self.cameras[cam], "frame_shape", (self.cameras[cam].height, self.cameras[cam].width, 3))
+            for cam in self.cameras
         }
+        # depth of cameras with use_depth, captured in the same frame set as the color image
+        for cam in self.cameras:
+            if getattr(self.cameras[cam], "use_depth", False):
+                features[f"{cam}_depth"] = getattr(
+                    self.cameras[cam], "depth_shape", (self.cameras[cam].height, self.cameras[cam].width, 3)
+                )
+        return features
 
     @property
     def observation_features(self) -> dict:
-        return {**self._motors_ft, **self._cameras_ft}
+        return {**self._motors_ft, **self._ee_ft, **self._cameras_ft}
 
     @property
     def action_features(self) -> dict:
@@ -80,29 +193,95 @@ class JAKAZU5(Robot):
         if self.is_connected:
             raise DeviceAlreadyConnectedError(f"{self} already connected")
         try:
-            self.rc = jkrc(self.robot_ip)
+            self.rc = self._make_rc()
             self.rc.login()
         except Exception as e:
             print(f"Error connecting to robot: {e}")
+            self.rc = None
             return
 
-        for cam in self.cameras.values():
-            cam.connect()
+        self.obs_executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.cameras)), thread_name_prefix=f"{self}_obs"
+        )
+        # cameras are brought up in parallel, so N cameras take about as long as the slowest one
+        futures = [self.obs_executor.submit(cam.connect) for cam in self.cameras.values()]
+        wait(futures)
+        for future in futures:
+            future.result()
 
         self.configure()
+        self._start_state_thread()
+        if self.config.ee_pose_features:
+            try:
+                self._check_kinematics()
+            except Exception:
+                self.disconnect()
+                raise
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.start()
+
+    def _make_rc(self):
+        if self.config.backend == "sim":
+            return sim_jkrc.RC(
+                self.robot_ip,
+                latency_s=self.config.sim_latency_s,
+                jitter_s=self.config.sim_jitter_s,
+                time_constant_s=self.config.sim_time_constant_s,
+                error_rate=self.config.sim_error_rate,
+            )
+        jkrc = _import_jkrc()
+        return jkrc.RC(self.robot_ip)
+
+    def _check_kinematics(self) -> None:
+        """
+        Checks the local forward kinematics behind the `ee.*` features against the controller's
+        `kine_forward` at the current joint positions.
+
+        Raises:
+            RuntimeError: If they disagree, e.g. the controller has a tool offset set or `ZU5_DH`
+                does not match the arm.
+        """
+        _, q = self.joint_state.latest()
+        ret = self.rc.kine_forward(list(q))
+        if ret[0] != 0:
+            raise RuntimeError(f"{self} kine_forward failed, errcode: {ret[0]}")
+        position_error, rotation_error = kine_forward_error(q, ret[1])
+        if position_error > KINEMATICS_TOLERANCE_M or rotation_error > KINEMATICS_TOLERANCE_RAD:
+            raise RuntimeError(
+                f"{self} forward kinematics (jaka_zu5.kinematics.ZU5_DH) disagree with the controller by "
+                f"{position_error * 1e3:.1f} mm / {math.degrees(rotation_error):.2f} deg. Check that no tool "
+                "offset is set on the controller, or disable `ee_pose_features`."
+            )
 
     def configure(self) -> None:
-        pass
+        if self.control_mode == "servo":
+            ret = self.rc.servo_move_enable(True)
+            if ret[0] != 0:
+                raise RuntimeError(f"{self} failed to enable servo mode, errcode: {ret[0]}")
+            if self.config.servo_lpf_hz > 0:
+                self.rc.servo_move_use_joint_LPF(self.config.servo_lpf_hz)
 
     def disconnect(self) -> None:
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
+        self.chunk_executor.stop()
+        self._stop_state_thread()
         if self.rc:
+            if self.control_mode == "servo":
+                self.rc.servo_move_enable(False)
             self.rc.logout()
             self.rc = None
 
-        for cam in self.cameras.values():
-            cam.disconnect()
+        if self.obs_executor is not None:
+            self.obs_executor.shutdown(wait=True)
+            self.obs_executor = None
+        for group in self.camera_groups.values():
+            group.disconnect()
+        for cam_key, cam in self.cameras.items():
+            if cam_key not in self._grouped_cameras:
+                cam.disconnect()
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.stop()
         logger.info(f"{self} disconnected.")
 
     @property
@@ -112,30 +291,153 @@ class JAKAZU5(Robot):
     def calibrate(self) -> None:
         pass
 
-    def get_observation(self) -> dict[str, Any]:
+    def _state_loop(self) -> None:
+        """
+        Internal loop run by the background state thread.
+
+        Polls the joint positions at `state_poll_hz` and appends `(monotonic_ts, q)` to the
+        joint state ring buffer. The timestamp is the midpoint of the controller round trip.
+        """
+        if self.state_stop_event is None:
+            raise RuntimeError(f"{self}: state_stop_event is not initialized before starting state loop.")
+
+        period_s = 1.0 / self.config.state_poll_hz
+        next_t = time.monotonic()
+        while not self.state_stop_event.is_set():
+            try:
+                start = time.monotonic()
+                t = time.perf_counter()
+                # jkrc answers state queries from its status connection, so this can run
+                # alongside (even blocking) motion commands issued by the control loop
+                ret = self.rc.get_joint_position()
+                _JOINT_READ_MS.observe_since(t)
+                end = time.monotonic()
+                if ret[0] == 0:
+                    self.joint_state.append(0.5 * (start + end), ret[1])
+                else:
+                    _JOINT_READ_ERRORS.inc()
+                    logger.warning(f"{self} get_joint_position failed, errcode: {ret[0]}")
+            except Exception as e:
+                _JOINT_READ_ERRORS.inc()
+                logger.warning(f"Error reading joint state in background thread for {self}: {e}")
+
+            next_t += period_s
+            remaining = next_t - time.monotonic()
+            if remaining > 0:
+                self.state_stop_event.wait(remaining)
+            else:
+                # fell behind, do not try to catch up with a burst of requests
+                next_t = time.monotonic()
+
+    def _start_state_thread(self, timeout_s: float = 1.0) -> None:
+        """Starts the state thread and waits until the first joint sample is buffered."""
+        self.state_stop_event = Event()
+        self.state_thread = Thread(target=self._state_loop, args=(), name=f"{self}_state_loop")
+        self.state_thread.daemon = True
+        self.state_thread.start()
+
+        deadline = time.monotonic() + timeout_s
+        while len(self.joint_state) == 0:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{self} received no joint state within {timeout_s} s.")
+            time.sleep(0.001)
+
+    def _stop_state_thread(self) -> None:
+        """Signals the state thread to stop and waits for it to join."""
+        if self.state_stop_event is not None:
+            self.state_stop_event.set()
+
+        if self.state_thread is not None and self.state_thread.is_alive():
+            self.state_thread.join(timeout=2.0)
+
+        self.state_thread = None
+        self.state_stop_event = None
+
+    def _read_camera(self, cam_key: str) -> tuple[NDArray[Any], NDArray[Any] | None, float]:
+        """
+        Waits for the next frame of one camera, returns it with the depth frame of the same
+        frame set (None without depth) and their capture timestamp.
+        """
+        cam = self.cameras[cam_key]
+        start = time.perf_counter()
+        if getattr(cam, "use_depth", False):
+            frame, depth = cam.async_read_rgbd()
+        else:
+            frame, depth = cam.async_read(), None
+        # cameras that do not report a capture time are stamped on arrival
+        ts = getattr(cam, "frame_timestamp", None) or time.monotonic()
+        dt_ms = (time.perf_counter() - start) * 1e3
+        logger.debug(f"{self} read {cam_key}: {dt_ms:.1f}ms")
+        return frame, depth, ts
+
+    def get_observation(self, timestamp: float | None = None) -> dict[str, Any]:
+        """
+        Returns the latest joint sample and camera frames.
+
+        All camera waits are issued at once on the observation thread pool, so the latency is
+        that of the slowest device rather than the sum of all of them. Joint positions come from
+        the state ring buffer and never wait on the network. If `timestamp` (time.monotonic()
+        clock) is given, joints are interpolated to that instant instead, e.g. to align them with
+        a camera frame.
+
+        Cameras with depth enabled contribute `<camera>_depth`, taken from the same frame set
+        as the color image by their background thread, at no added latency.
+
+        Cameras of a group in `camera_groups` are read as one synchronized frame set: they share
+        one `timestamp.<camera>`, and the arrival skew between them is under
+        `timestamp.<group>.skew` (s).
+
+        Besides the features, the observation carries the capture time of every source under
+        `timestamp.joints` / `timestamp.<camera>` and the spread between them under
+        `timestamp.skew` (s).
+        """
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
 
-        # Read arm position
+        obs_start = time.perf_counter()
+        # Capture images from cameras
+        futures = {
+            cam_key: self.obs_executor.submit(self._read_camera, cam_key)
+            for cam_key in self.cameras
+            if cam_key not in self._grouped_cameras
+        }
+        group_futures = {key: self.obs_executor.submit(group.async_read) for key, group in self.camera_groups.items()}
+
+        # Read arm position while the cameras are waited on
         start = time.perf_counter()
-        ret = self.rc.get_joint_position()
-        joint_positions = []
-        if ret[0] == 0:
-            print("the joint position is :", ret[1])
-            joint_positions = ret[1]
+        if timestamp is None:
+            sample = self.joint_state.latest()
         else:
-            print("some things happend,the errcode is: ",ret[0])
-         
-        obs_dict = {f"joint_{i}": val for i, val in enumerate(joint_positions)}
+            sample = self.joint_state.interpolate(timestamp)
+        if sample is None:
+            raise RuntimeError(f"{self} has no joint state sample yet.")
+        joint_ts, joint_positions = sample
+
+        obs_dict = {f"joint_{i}": float(val) for i, val in enumerate(joint_positions)}
+        if self.config.ee_pose_features:
+            # local FK instead of a controller round trip for the Cartesian pose
+            obs_dict.update(zip(EE_POSE_KEYS, ee_pose(joint_positions).tolist(), strict=True))
+        obs_dict["timestamp.joints"] = joint_ts
         dt_ms = (time.perf_counter() - start) * 1e3
         logger.debug(f"{self} read state: {dt_ms:.1f}ms")
 
-        # Capture images from cameras
-        for cam_key, cam in self.cameras.items():
-            start = time.perf_counter()
-            obs_dict[cam_key] = cam.async_read()
-            dt_ms = (time.perf_counter() - start) * 1e3
-            logger.debug(f"{self} read {cam_key}: {dt_ms:.1f}ms")
+        timestamps = [joint_ts]
+        for cam_key, future in futures.items():
+            obs_dict[cam_key], depth, obs_dict[f"timestamp.{cam_key}"] = future.result()
+            if depth is not None:
+                obs_dict[f"{cam_key}_depth"] = depth
+            timestamps.append(obs_dict[f"timestamp.{cam_key}"])
+        for group_key, future in group_futures.items():
+            frame_set = future.result()
+            for cam_key, frame in frame_set.frames.items():
+                obs_dict[cam_key] = frame
+                if frame_set.depths[cam_key] is not None:
+                    obs_dict[f"{cam_key}_depth"] = frame_set.depths[cam_key]
+                obs_dict[f"timestamp.{cam_key}"] = frame_set.timestamp
+            obs_dict[f"timestamp.{group_key}.skew"] = frame_set.max_skew_ms / 1e3
+            timestamps.append(frame_set.timestamp)
+        obs_dict["timestamp.skew"] = max(timestamps) - min(timestamps)
+        _OBSERVATION_MS.observe_since(obs_start)
 
         return obs_dict
 
@@ -145,15 +447,93 @@ class JAKAZU5(Robot):
         # Check if action is valid
         if not all(key in self.action_features for key in action.keys()):
             raise ValueError(f"Invalid action: {action}, features: {self.action_features}")
+        # a single action overrides any chunk still being executed. The executor thread is
+        # joined, not just cleared, so it cannot be sending through the safety filter concurrently
+        if self.chunk_executor.is_running:
+            self.chunk_executor.stop()
         #机器人关节运动目标位置
         joint_pos = [action[f"joint_{i}"] for i in range(6)]
-        #0 代表绝对运动，1 代表相对运动
-        MODE = 0
-        #设置接口是否为阻塞接口，TRUE 为阻塞接口 FALSE 为非阻塞接口，阻塞表示机器人运动完成才会有返回值，非阻塞表示接口调用完成立刻就有返回值。
-        is_block = True
-        #机器人关节运动速度，单位：rad/s
-        SPEED = 0.2
-        # Send goal position to the arm
-        self.rc.joint_move(joint_pos, MODE, is_block, SPEED)
-
-        return action
\ No newline at end of file
+        sent = self._send_joint_command(joint_pos)
+
+        # the action actually sent, after the safety filter
+        return {f"joint_{i}": float(val) for i, val in enumerate(sent)}
+
+    def send_action_chunk(self, chunk: NDArray[Any], t0: float | None = None) -> None:
+        """
+        Queues a `(k, 6)` chunk of joint targets for execution, ACT/SmolVLA style.
+
+        The chunk executor thread blends it with the other overlapping chunks using temporal
+        ensembling and streams the result with servo_j at the servo rate, so the policy can run
+        much slower than the control loop. With the safety filter enabled, the chunk is first
+        bounded to the joint position limits and the max step, starting from the measured joint
+        positions, and the blended stream goes through the full safety filter (velocity,
+        acceleration, jerk) before every servo_j.
+
+        Args:
+            chunk: Joint targets, row `i` is due at `t0 + i / chunk_fps`.
+            t0: time.monotonic() timestamp of the first action, defaults to now. Passing the
+                timestamp of the observation the chunk was inferred from compensates for the
+                inference latency.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        if self.control_mode != "servo":
+            raise RuntimeError(f"{self} can only execute action chunks with control_mode='servo'.")
+
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if self.chunk_safety_filter is not None and chunk.ndim == 2 and len(chunk) <= self.config.max_chunk_len:
+            sample = self.joint_state.latest()
+            if sample is None:
+                raise RuntimeError(f"{self} has no joint state sample yet.")
+            chunk = self.chunk_safety_filter.filter_chunk(chunk, sample[1], out=self._chunk_buffer[: len(chunk)])
+        self.chunk_executor.submit(chunk, time.monotonic() if t0 is None else t0)
+        self.chunk_executor.start()
+
+    def clip_stats(self) -> dict[str, list[int]]:
+        """Returns per safety limit, per joint, how many targets were clipped since construction."""
+        if self.safety_filter is None:
+            return {}
+        counts = self.safety_filter.clip_counts + self.chunk_safety_filter.clip_counts
+        return {name: row.tolist() for name, row in zip(LIMITS, counts, strict=True)}
+
+    def _count_clips(self) -> None:
+        """
+        Forwards new safety filter clips to the metrics registry. Called with every command, from
+        the chunk executor thread or from the `send_action` caller, never both at once since
+        `send_action` stops the executor first.
+        """
+        totals = self.safety_filter.clip_counts.sum(axis=1) + self.chunk_safety_filter.clip_counts.sum(axis=1)
+        for counter, new, old in zip(_SAFETY_CLIPS, totals, self._clip_totals, strict=True):
+            if new != old:
+                counter.inc(int(new - old))
+        self._clip_totals[:] = totals
+
+    def _send_joint_command(self, joint_pos: Any) -> Any:
+        """Sends one joint target through the safety filter, returns the target actually sent."""
+        start = time.perf_counter()
+        now = time.monotonic()
+        step_num = self.servo_step_num
+        if self.config.servo_period_s is None and self._last_command_t is not None:
+            interval = now - self._last_command_t
+            if interval <= SERVO_FOLLOW_MAX_S:
+                step_num = max(step_num, round(interval / SERVO_CYCLE_S))
+        self._last_command_t = now
+
+        if self.safety_filter is not None:
+            sample = self.joint_state.latest()
+            if sample is None:
+                raise RuntimeError(f"{self} has no joint state sample yet.")
+            joint_pos = self.safety_filter.filter(joint_pos, sample[1], now)
+            self._count_clips()
+            joint_pos = joint_pos.tolist()
+        if self.control_mode == "servo":
+            # 非阻塞接口：控制器在 step_num 个 8ms 周期内插补到目标位置，调用立即返回
+            ret = self.rc.servo_j(joint_pos, ABS, step_num)
+        else:
+            #设置接口是否为阻塞接口，阻塞表示机器人运动完成才会有返回值
+            ret = self.rc.joint_move(joint_pos, ABS, True, self.config.joint_move_speed)
+        _JOINT_COMMAND_MS.observe_since(start)
+        if ret[0] != 0:
+            _JOINT_COMMAND_ERRORS.inc()
+            logger.warning(f"{self} {self.control_mode} command rejected, errcode: {ret[0]}")
+        return joint_pos
@@ -0,0 +1,78 @@
+"""
+Provides JointStateBuffer, a preallocated ring buffer of timestamped joint samples.
+"""
+
+from threading import Lock
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class JointStateBuffer:
+    """
+    Fixed-size ring buffer of `(monotonic_ts, q)` joint samples.
+
+    One writer (the robot state thread) appends samples, readers fetch the newest sample or the
+    sample interpolated to a given timestamp. The storage is allocated once, the lock is only held
+    while indices are updated or a single row is copied out.
+
+    Args:
+        capacity: Number of samples kept before the oldest ones are overwritten.
+        num_joints: Number of joint values per sample.
+    """
+
+    def __init__(self, capacity: int = 1024, num_joints: int = 6):
+        self.capacity = capacity
+        self.num_joints = num_joints
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.positions = np.zeros((capacity, num_joints), dtype=np.float64)
+        # total number of samples ever written, the write slot is `count % capacity`
+        self.count = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp: float, q: Any) -> None:
+        with self._lock:
+            idx = self.count % self.capacity
+            self.timestamps[idx] = timestamp
+            self.positions[idx] = q
+            self.count += 1
+
+    def latest(self) -> tuple[float, NDArray[np.float64]] | None:
+        """Returns a copy of the newest sample, or None if nothing was written yet."""
+        with self._lock:
+            if self.count == 0:
+                return None
+            idx = (self.count - 1) % self.capacity
+            return float(self.timestamps[idx]), self.positions[idx].copy()
+
+    def interpolate(self, timestamp: float) -> tuple[float, NDArray[np.float64]] | None:
+        """
+        Returns the joint positions linearly interpolated to `timestamp`.
+
+        Timestamps outside the buffered window are clamped to the oldest/newest sample, the
+        returned timestamp is the one the positions actually correspond to.
+        """
+        with self._lock:
+            n = len(self)
+            if n == 0:
+                return None
+            newest = (self.count - 1) % self.capacity
+            if timestamp >= self.timestamps[newest]:
+                return float(self.timestamps[newest]), self.positions[newest].copy()
+
+            # Buffer slots in chronological order
+            order = (self.count - n + np.arange(n)) % self.capacity
+            ts = self.timestamps[order]
+            i = int(np.searchsorted(ts, timestamp, side="right"))
+            if i == 0:
+                return float(ts[0]), self.positions[order[0]].copy()
+
+            lo, hi = order[i - 1], order[i]
+            t_lo, t_hi = ts[i - 1], ts[i]
+            alpha = (timestamp - t_lo) / (t_hi - t_lo) if t_hi > t_lo else 0.0
+            q = self.positions[lo] + alpha * (self.positions[hi] - self.positions[lo])
+            return float(timestamp), q
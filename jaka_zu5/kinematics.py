@@ -0,0 +1,160 @@
+"""
+Vectorized forward kinematics of the JAKA ZU5.
+
+All functions take joint positions of shape (6,) or (N, 6) in radians and evaluate the whole batch
+in a handful of numpy calls, so they are cheap enough for the servo rate and for whole datasets
+offline. Poses are those of the flange (no tool offset), in the base frame, in meters.
+
+Example:
+
+```python
+from jaka_zu5.kinematics import ee_pose
+
+pose = ee_pose(joints)  # (N, 7): x, y, z, qx, qy, qz, qw
+```
+"""
+
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Standard DH parameters of the ZU5, one row per joint: a (m), alpha (rad), d (m), theta offset (rad).
+# Taken from the ZU5 user manual. JAKAZU5 checks them against `rc.kine_forward` at connect when
+# `ee_pose_features` is enabled, see `kine_forward_error`.
+ZU5_DH = np.array(
+    [
+        [0.0, np.pi / 2, 0.12015, 0.0],
+        [0.430, 0.0, 0.0, 0.0],
+        [0.3685, 0.0, 0.0, 0.0],
+        [0.0, np.pi / 2, -0.1135, 0.0],
+        [0.0, -np.pi / 2, 0.1135, 0.0],
+        [0.0, 0.0, 0.107, 0.0],
+    ]
+)
+
+
+def forward_kinematics(q: NDArray[Any], dh: NDArray[Any] = ZU5_DH) -> NDArray[np.float64]:
+    """
+    Returns the flange transform(s) for joint positions `q`.
+
+    Args:
+        q: Joint positions, shape (6,) or (N, 6), in radians.
+        dh: DH table, see `ZU5_DH`.
+
+    Returns:
+        Homogeneous transforms of shape (4, 4) or (N, 4, 4).
+    """
+    q = np.asarray(q, dtype=np.float64)
+    single = q.ndim == 1
+    q = np.atleast_2d(q)
+
+    a, alpha, d, offset = dh.T
+    theta = q + offset
+    ct, st = np.cos(theta), np.sin(theta)
+    ca, sa = np.cos(alpha), np.sin(alpha)
+
+    # per-joint DH transforms Rz(theta) Tz(d) Tx(a) Rx(alpha), shape (N, 6, 4, 4)
+    links = np.zeros(q.shape + (4, 4))
+    links[..., 0, 0] = ct
+    links[..., 0, 1] = -st * ca
+    links[..., 0, 2] = st * sa
+    links[..., 0, 3] = a * ct
+    links[..., 1, 0] = st
+    links[..., 1, 1] = ct * ca
+    links[..., 1, 2] = -ct * sa
+    links[..., 1, 3] = a * st
+    links[..., 2, 1] = sa
+    links[..., 2, 2] = ca
+    links[..., 2, 3] = d
+    links[..., 3, 3] = 1.0
+
+    pose = links[:, 0]
+    for i in range(1, links.shape[1]):
+        pose = pose @ links[:, i]
+
+    return pose[0] if single else pose
+
+
+def rotation_to_quaternion(rot: NDArray[Any]) -> NDArray[np.float64]:
+    """
+    Converts rotation matrices of shape (..., 3, 3) to unit quaternions (..., 4) in (x, y, z, w)
+    order, with w >= 0.
+    """
+    rot = np.asarray(rot, dtype=np.float64)
+    m00, m11, m22 = rot[..., 0, 0], rot[..., 1, 1], rot[..., 2, 2]
+
+    # The four (unnormalized) candidates, each well conditioned when its own component is large.
+    # Pick per sample the one built around the largest of |w|, |x|, |y|, |z|.
+    candidates = np.stack(
+        [
+            np.stack([rot[..., 2, 1] - rot[..., 1, 2], rot[..., 0, 2] - rot[..., 2, 0],
+                      rot[..., 1, 0] - rot[..., 0, 1], 1.0 + m00 + m11 + m22], axis=-1),
+            np.stack([1.0 + m00 - m11 - m22, rot[..., 0, 1] + rot[..., 1, 0],
+                      rot[..., 0, 2] + rot[..., 2, 0], rot[..., 2, 1] - rot[..., 1, 2]], axis=-1),
+            np.stack([rot[..., 0, 1] + rot[..., 1, 0], 1.0 - m00 + m11 - m22,
+                      rot[..., 1, 2] + rot[..., 2, 1], rot[..., 0, 2] - rot[..., 2, 0]], axis=-1),
+            np.stack([rot[..., 0, 2] + rot[..., 2, 0], rot[..., 1, 2] + rot[..., 2, 1],
+                      1.0 - m00 - m11 + m22, rot[..., 1, 0] - rot[..., 0, 1]], axis=-1),
+        ],
+        axis=-2,
+    )  # fmt: skip
+    trace_terms = np.stack([m00 + m11 + m22, m00, m11, m22], axis=-1)
+    best = np.argmax(trace_terms, axis=-1)
+    quat = np.take_along_axis(candidates, best[..., None, None], axis=-2)[..., 0, :]
+
+    quat /= np.linalg.norm(quat, axis=-1, keepdims=True)
+    return np.where(quat[..., 3:4] < 0, -quat, quat)
+
+
+def ee_pose(q: NDArray[Any], dh: NDArray[Any] = ZU5_DH) -> NDArray[np.float64]:
+    """Returns the flange pose(s) as (x, y, z, qx, qy, qz, qw), shape (7,) or (N, 7)."""
+    pose = forward_kinematics(q, dh)
+    return np.concatenate([pose[..., :3, 3], rotation_to_quaternion(pose[..., :3, :3])], axis=-1)
+
+
+def rpy_to_rotation(rpy: NDArray[Any]) -> NDArray[np.float64]:
+    """Converts (rx, ry, rz) angles (..., 3) to rotation matrices (..., 3, 3), R = Rz Ry Rx as in jkrc."""
+    rpy = np.asarray(rpy, dtype=np.float64)
+    cx, cy, cz = np.cos(rpy[..., 0]), np.cos(rpy[..., 1]), np.cos(rpy[..., 2])
+    sx, sy, sz = np.sin(rpy[..., 0]), np.sin(rpy[..., 1]), np.sin(rpy[..., 2])
+    rot = np.empty(rpy.shape[:-1] + (3, 3))
+    rot[..., 0, 0] = cz * cy
+    rot[..., 0, 1] = cz * sy * sx - sz * cx
+    rot[..., 0, 2] = cz * sy * cx + sz * sx
+    rot[..., 1, 0] = sz * cy
+    rot[..., 1, 1] = sz * sy * sx + cz * cx
+    rot[..., 1, 2] = sz * sy * cx - cz * sx
+    rot[..., 2, 0] = -sy
+    rot[..., 2, 1] = cy * sx
+    rot[..., 2, 2] = cy * cx
+    return rot
+
+
+def rotation_to_rpy(rot: NDArray[Any]) -> NDArray[np.float64]:
+    """Inverse of `rpy_to_rotation`, away from the ry = +-pi/2 singularity."""
+    rot = np.asarray(rot, dtype=np.float64)
+    rx = np.arctan2(rot[..., 2, 1], rot[..., 2, 2])
+    ry = np.arcsin(np.clip(-rot[..., 2, 0], -1.0, 1.0))
+    rz = np.arctan2(rot[..., 1, 0], rot[..., 0, 0])
+    return np.stack([rx, ry, rz], axis=-1)
+
+
+def kine_forward_error(q: NDArray[Any], tcp_pose: Any, dh: NDArray[Any] = ZU5_DH) -> tuple[float, float]:
+    """
+    Compares `forward_kinematics` with the pose the controller reports for the same joints.
+
+    Args:
+        q: Joint positions, shape (6,), in radians.
+        tcp_pose: `rc.kine_forward(q)[1]`: x, y, z (mm), rx, ry, rz (rad).
+        dh: DH table, see `ZU5_DH`.
+
+    Returns:
+        tuple: Position error (m) and rotation error (rad, angle of the relative rotation).
+    """
+    pose = forward_kinematics(q, dh)
+    tcp_pose = np.asarray(tcp_pose, dtype=np.float64)
+    position_error = float(np.linalg.norm(pose[:3, 3] - tcp_pose[:3] / 1000.0))
+    relative = pose[:3, :3].T @ rpy_to_rotation(tcp_pose[3:6])
+    rotation_error = float(np.arccos(np.clip((np.trace(relative) - 1.0) / 2.0, -1.0, 1.0)))
+    return position_error, rotation_error
@@ -0,0 +1,221 @@
+"""
+Provides JointSafetyFilter, which bounds joint targets before they are sent to the arm.
+"""
+
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Fraction of a_max assumed available for braking, the rest absorbs the jerk limited ramp-up
+BRAKE_MARGIN = 0.5
+
+# Order of the limits in `JointSafetyFilter.clip_counts`
+LIMITS = ("jerk", "acceleration", "velocity", "position", "max_step")
+
+
+class JointSafetyFilter:
+    """
+    Clips joint targets to position, velocity, acceleration and jerk limits, and to a maximum step.
+
+    The derivatives are taken with respect to the previous filtered target: a new target is first
+    limited in jerk, then the resulting acceleration, then velocity, then position. The max step
+    bounds the distance from a reference, the measured joint state in single-step mode and the
+    previous row in chunk mode, where only the position limits and the max step apply. All
+    operations work in place on preallocated buffers, a single step costs a few tens of
+    microseconds.
+
+    In single-step mode the derivatives are taken over the measured time since the previous
+    target, at least `dt`, so the limits hold whatever the rate the targets are sent at.
+
+    Every limit counts, per joint, how many targets it clipped (`clip_counts`, rows in `LIMITS`
+    order). Pass `np.inf` to disable a limit. An instance is not thread-safe.
+
+    Args:
+        dt: Time between two consecutive targets (s), the shortest time a target can be reached
+            in (the servo period).
+        q_min, q_max: Joint position limits (rad).
+        v_max: Joint velocity limits (rad/s).
+        a_max: Joint acceleration limits (rad/s^2).
+        j_max: Joint jerk limits (rad/s^3).
+        max_step: Maximum distance of a target from the reference (rad).
+        reset_after_s: If no target was filtered for this long, the derivative state is reset to
+            rest at the measured position, so a paused policy does not resume with stale velocity.
+    """
+
+    def __init__(
+        self,
+        dt: float,
+        q_min: Any,
+        q_max: Any,
+        v_max: Any = np.inf,
+        a_max: Any = np.inf,
+        j_max: Any = np.inf,
+        max_step: Any = np.inf,
+        num_joints: int = 6,
+        reset_after_s: float = 0.5,
+    ):
+        self.dt = dt
+        self.num_joints = num_joints
+        self.reset_after_s = reset_after_s
+
+        def limit(value: Any) -> NDArray[np.float64]:
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (num_joints,)).copy()
+
+        self.q_min = limit(q_min)
+        self.q_max = limit(q_max)
+        self.v_max = limit(v_max)
+        self.a_max = limit(a_max)
+        self.j_max = limit(j_max)
+        self.max_step = limit(max_step)
+
+        # previous filtered target and its derivatives
+        self.q_prev = np.zeros(num_joints)
+        self.v_prev = np.zeros(num_joints)
+        self.a_prev = np.zeros(num_joints)
+        self.initialized = False
+        self.last_t: float | None = None
+
+        self.clip_counts = np.zeros((len(LIMITS), num_joints), dtype=np.int64)
+
+        # scratch buffers
+        self._q = np.zeros(num_joints)
+        self._v = np.zeros(num_joints)
+        self._a = np.zeros(num_joints)
+        self._j = np.zeros(num_joints)
+        self._lo = np.zeros(num_joints)
+        self._hi = np.zeros(num_joints)
+        self._mask = np.zeros(num_joints, dtype=bool)
+        self._mask2 = np.zeros(num_joints, dtype=bool)
+        self._ref = np.zeros(num_joints)
+        self._e = np.zeros(num_joints)
+        self._brake = np.zeros(num_joints)
+
+    def reset(self, q: Any) -> None:
+        """Restarts the filter at rest at position `q`."""
+        self.q_prev[:] = q
+        self.v_prev[:] = 0.0
+        self.a_prev[:] = 0.0
+        self.initialized = True
+
+    def clip_stats(self) -> dict[str, list[int]]:
+        """Returns per limit, per joint, how many targets were clipped."""
+        return {name: counts.tolist() for name, counts in zip(LIMITS, self.clip_counts, strict=True)}
+
+    def _clip(self, x: NDArray[Any], lo: NDArray[Any], hi: NDArray[Any], limit_idx: int) -> None:
+        np.less(x, lo, out=self._mask)
+        np.greater(x, hi, out=self._mask2)
+        np.logical_or(self._mask, self._mask2, out=self._mask)
+        self.clip_counts[limit_idx] += self._mask
+        np.maximum(x, lo, out=x)
+        np.minimum(x, hi, out=x)
+
+    def _step(self, q: NDArray[Any], q_ref: NDArray[Any] | None, dt: float) -> None:
+        """Filters `q` in place against the state and advances the state."""
+        j, a, v = self._j, self._a, self._v
+
+        # velocity allowed towards the target so the arm can still brake to rest on it with
+        # a_max, this keeps the clipped response from overshooting and oscillating
+        np.subtract(q, self.q_prev, out=self._e)
+        np.abs(self._e, out=self._brake)
+        self._brake *= 2.0 * BRAKE_MARGIN
+        self._brake *= self.a_max
+        np.sqrt(self._brake, out=self._brake)
+        np.minimum(self._brake, self.v_max, out=self._brake)
+
+        # jerk -> acceleration
+        np.subtract(q, self.q_prev, out=v)
+        v /= dt
+        np.subtract(v, self.v_prev, out=a)
+        a /= dt
+        np.subtract(a, self.a_prev, out=j)
+        j /= dt
+        np.negative(self.j_max, out=self._lo)
+        self._clip(j, self._lo, self.j_max, 0)
+        np.multiply(j, dt, out=a)
+        a += self.a_prev
+
+        # acceleration -> velocity
+        np.negative(self.a_max, out=self._lo)
+        self._clip(a, self._lo, self.a_max, 1)
+        np.multiply(a, dt, out=v)
+        v += self.v_prev
+
+        # velocity -> position
+        np.negative(self.v_max, out=self._lo)
+        np.copyto(self._hi, self.v_max)
+        # tighten the bound on the side of the target
+        np.greater_equal(self._e, 0.0, out=self._mask)
+        np.copyto(self._hi, self._brake, where=self._mask)
+        np.logical_not(self._mask, out=self._mask)
+        np.negative(self._brake, out=self._lo, where=self._mask)
+        self._clip(v, self._lo, self._hi, 2)
+        np.multiply(v, dt, out=q)
+        q += self.q_prev
+
+        self._clip(q, self.q_min, self.q_max, 3)
+
+        if q_ref is not None:
+            np.subtract(q_ref, self.max_step, out=self._lo)
+            np.add(q_ref, self.max_step, out=self._hi)
+            self._clip(q, self._lo, self._hi, 4)
+
+        # state from the final target, so derivatives stay consistent after position clipping
+        np.subtract(q, self.q_prev, out=v)
+        v /= dt
+        np.subtract(v, self.v_prev, out=a)
+        a /= dt
+        self.q_prev[:] = q
+        self.v_prev[:] = v
+        self.a_prev[:] = a
+
+    def filter(self, q_cmd: Any, q_measured: Any, t: float | None = None) -> NDArray[np.float64]:
+        """
+        Filters one target.
+
+        Args:
+            q_cmd: Joint target from the policy.
+            q_measured: Latest measured joint positions, reference of the max step.
+            t: time.monotonic() of the command. The derivatives are taken over the time since
+                the previous command (at least `dt`), and the state is reset after a pause.
+
+        Returns:
+            The filtered target. It is an internal buffer, overwritten by the next call.
+        """
+        dt = self.dt
+        if t is not None and self.last_t is not None:
+            dt = max(self.dt, t - self.last_t)
+        if not self.initialized or dt > self.reset_after_s:
+            self.reset(q_measured)
+            dt = self.dt
+        self.last_t = t
+
+        self._q[:] = q_cmd
+        self._step(self._q, np.asarray(q_measured, dtype=np.float64), dt)
+        return self._q
+
+    def filter_chunk(self, chunk: NDArray[Any], q_measured: Any, out: NDArray[Any] | None = None) -> NDArray[np.float64]:
+        """
+        Bounds a `(k, num_joints)` chunk of targets to the position limits and the max step, the
+        first row to `max_step` from `q_measured` and every other row to `max_step` from the
+        previous one.
+
+        The velocity, acceleration and jerk limits are not applied here: the chunk does not know
+        how fast the arm is already moving, the blended stream is filtered with them by `filter()`
+        before it is sent. The streaming state of `filter()` is left untouched.
+
+        Returns:
+            The bounded chunk, written into `out` if given.
+        """
+        if out is None:
+            out = np.empty(chunk.shape, dtype=np.float64)
+        out[:] = chunk
+
+        self._ref[:] = q_measured
+        for row in out:
+            self._clip(row, self.q_min, self.q_max, 3)
+            np.subtract(self._ref, self.max_step, out=self._lo)
+            np.add(self._ref, self.max_step, out=self._hi)
+            self._clip(row, self._lo, self._hi, 4)
+            self._ref[:] = row
+        return out
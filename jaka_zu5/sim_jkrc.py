@@ -0,0 +1,160 @@
+"""
+Pure-Python stand-in for the native `jkrc` module, for exercising JAKAZU5 without a ZU5.
+
+`RC` implements the subset of `jkrc.RC` used by the driver. Joints follow a first-order model
+towards the last commanded target, every call sleeps for a configurable network latency plus
+jitter, and calls can be made to fail at a given rate to exercise error handling.
+
+Select it with `JAKAZU5Config(backend="sim")`.
+"""
+
+import math
+import random
+import time
+from threading import Lock
+
+from jaka_zu5.kinematics import forward_kinematics, rotation_to_rpy
+
+# jkrc error codes
+ERR_SUCC = 0
+ERR_FUCTION_CALL_ERROR = 2
+
+
+class RC:
+    """
+    Simulated JAKA controller.
+
+    Args:
+        ip: Ignored, kept for signature compatibility with `jkrc.RC`.
+        latency_s: Fixed round trip time of every call.
+        jitter_s: Extra uniformly distributed round trip time in [0, jitter_s].
+        time_constant_s: Time constant of the first-order joint response.
+        error_rate: Probability that a call fails with ERR_FUCTION_CALL_ERROR.
+        initial_joints: Initial joint positions (rad).
+    """
+
+    def __init__(
+        self,
+        ip: str = "",
+        latency_s: float = 0.001,
+        jitter_s: float = 0.0005,
+        time_constant_s: float = 0.05,
+        error_rate: float = 0.0,
+        initial_joints: list[float] | None = None,
+    ):
+        self.ip = ip
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.time_constant_s = time_constant_s
+        self.error_rate = error_rate
+
+        self.q = list(initial_joints) if initial_joints is not None else [0.0] * 6
+        self.target = list(self.q)
+        self.last_update = time.monotonic()
+
+        self.logged_in = False
+        self.powered = False
+        self.enabled = False
+        self.servo_enabled = False
+        self.num_calls = 0
+        self._lock = Lock()
+
+    def _round_trip(self) -> bool:
+        """Sleeps for one simulated round trip, returns False if the call should fail."""
+        self.num_calls += 1
+        delay = self.latency_s + random.uniform(0.0, self.jitter_s)
+        if delay > 0:
+            time.sleep(delay)
+        return random.random() >= self.error_rate
+
+    def _advance(self) -> None:
+        """Integrates the first-order joint response up to now."""
+        now = time.monotonic()
+        decay = math.exp(-(now - self.last_update) / self.time_constant_s) if self.time_constant_s > 0 else 0.0
+        self.q = [t + (q - t) * decay for q, t in zip(self.q, self.target, strict=True)]
+        self.last_update = now
+
+    def login(self):
+        self._round_trip()
+        self.logged_in = True
+        return (ERR_SUCC,)
+
+    def logout(self):
+        self._round_trip()
+        self.logged_in = False
+        self.servo_enabled = False
+        return (ERR_SUCC,)
+
+    def power_on(self):
+        self._round_trip()
+        self.powered = True
+        return (ERR_SUCC,)
+
+    def power_off(self):
+        self._round_trip()
+        self.powered = self.enabled = False
+        return (ERR_SUCC,)
+
+    def enable_robot(self):
+        self._round_trip()
+        self.enabled = True
+        return (ERR_SUCC,)
+
+    def disable_robot(self):
+        self._round_trip()
+        self.enabled = False
+        return (ERR_SUCC,)
+
+    def get_joint_position(self):
+        if not self._round_trip():
+            return (ERR_FUCTION_CALL_ERROR,)
+        with self._lock:
+            self._advance()
+            return (ERR_SUCC, list(self.q))
+
+    def kine_forward(self, joint_pos):
+        if not self._round_trip():
+            return (ERR_FUCTION_CALL_ERROR,)
+        pose = forward_kinematics(joint_pos)
+        rpy = rotation_to_rpy(pose[:3, :3])
+        return (ERR_SUCC, [*(1000.0 * pose[:3, 3]).tolist(), *rpy.tolist()])
+
+    def servo_move_enable(self, enable: bool):
+        self._round_trip()
+        self.servo_enabled = bool(enable)
+        return (ERR_SUCC,)
+
+    def servo_move_use_joint_LPF(self, cutoff_freq: float):
+        self._round_trip()
+        return (ERR_SUCC,)
+
+    def servo_move_use_none_filter(self):
+        self._round_trip()
+        return (ERR_SUCC,)
+
+    def servo_j(self, joint_pos, move_mode: int, step_num: int = 1):
+        if not self._round_trip() or not self.servo_enabled:
+            return (ERR_FUCTION_CALL_ERROR,)
+        with self._lock:
+            self._advance()
+            if move_mode == 1:
+                self.target = [t + d for t, d in zip(self.target, joint_pos, strict=True)]
+            else:
+                self.target = list(joint_pos)
+        return (ERR_SUCC,)
+
+    def joint_move(self, joint_pos, move_mode: int, is_block: bool, speed: float):
+        if not self._round_trip() or self.servo_enabled:
+            return (ERR_FUCTION_CALL_ERROR,)
+        with self._lock:
+            self._advance()
+            if move_mode == 1:
+                target = [t + d for t, d in zip(self.target, joint_pos, strict=True)]
+            else:
+                target = list(joint_pos)
+            duration_s = max(abs(t - q) for t, q in zip(target, self.q, strict=True)) / speed
+            self.target = target
+        if is_block:
+            # time the move takes at `speed` plus the settling of the joint response
+            time.sleep(duration_s + 3 * self.time_constant_s)
+        return (ERR_SUCC,)
@@ -12,5 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from .camera_group import GroupFrameSet, PercipioCameraGroup
 from .camera_percipio import PercipioCamera
 from .configuration_percipio import PercipioCameraConfig
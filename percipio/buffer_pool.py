@@ -0,0 +1,77 @@
+"""
+Provides BufferPool, a small recycler of output frame arrays.
+"""
+
+import weakref
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from zprobot_metrics import REGISTRY
+
+_POOL_ALLOCATIONS = REGISTRY.counter("percipio.buffer_pool_allocations")
+
+
+class BufferPool:
+    """
+    Fixed ring of preallocated arrays that frames are written into, instead of allocating a new
+    array per frame.
+
+    Ownership: an array handed out by `acquire()` belongs to the caller as long as anything
+    references it (the array itself or a view of it). Every `acquire()` wraps the pooled memory in
+    a new memoryview that the returned array and all its views keep alive through their `.base`
+    chain, and the pool only holds a weak reference to it. The memory is recycled once that
+    memoryview is gone, i.e. once every outside reference is dropped, so frames returned to users
+    are never overwritten behind their back. When all arrays are still held, a new one is allocated in place of the oldest, which
+    is counted in `percipio.buffer_pool_allocations`. In steady state (consumers dropping frames
+    within `size - 1` frames) no allocation happens.
+
+    Not thread-safe, each producer thread should own its pools.
+
+    Args:
+        size: Number of arrays in the ring.
+    """
+
+    def __init__(self, size: int = 4):
+        if size < 2:
+            raise ValueError(f"BufferPool size must be at least 2, but {size} is provided.")
+        self.size = size
+        self.shape: tuple[int, ...] | None = None
+        self.dtype: np.dtype | None = None
+        self._buffers: list[NDArray[np.uint8]] = []
+        # weak references to the memoryview of the last array handed out per buffer
+        self._owners: list[weakref.ref | None] = []
+        self._next = 0
+
+    def acquire(self, shape: tuple[int, ...], dtype: Any = np.uint8) -> NDArray[Any]:
+        """Returns an array of `shape` and `dtype` that no consumer references anymore."""
+        shape, dtype = tuple(shape), np.dtype(dtype)
+        if shape != self.shape or dtype != self.dtype:
+            # frame format changed, start over with arrays of the new layout
+            self.shape, self.dtype = shape, dtype
+            nbytes = int(np.prod(shape)) * dtype.itemsize
+            self._buffers = [np.empty(nbytes, np.uint8) for _ in range(self.size)]
+            self._owners = [None] * self.size
+            self._next = 0
+            _POOL_ALLOCATIONS.inc(self.size)
+
+        for _ in range(self.size):
+            idx = self._next
+            self._next = (idx + 1) % self.size
+            owner = self._owners[idx]
+            if owner is None or owner() is None:
+                return self._hand_out(idx)
+
+        # every array is still held by a consumer, replace the oldest rather than overwrite it
+        idx = self._next
+        self._next = (idx + 1) % self.size
+        self._buffers[idx] = np.empty_like(self._buffers[idx])
+        _POOL_ALLOCATIONS.inc()
+        return self._hand_out(idx)
+
+    def _hand_out(self, idx: int) -> NDArray[Any]:
+        flat = np.frombuffer(memoryview(self._buffers[idx]), dtype=self.dtype)
+        # `flat.base` is the memoryview, referenced by every array derived from `flat`
+        self._owners[idx] = weakref.ref(flat.base)
+        return flat.reshape(self.shape)
@@ -0,0 +1,271 @@
+"""
+Provides PercipioCameraGroup, which captures time-consistent frame sets from several Percipio
+cameras.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from typing import Any
+
+from numpy.typing import NDArray
+
+from lerobot.utils.errors import DeviceNotConnectedError
+
+from percipio.camera_percipio import PercipioCamera
+from zprobot_metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_GROUP_READ_MS = REGISTRY.histogram("percipio.group_read_ms")
+_GROUP_SKEW_MS = REGISTRY.histogram("percipio.group_skew_ms")
+_GROUP_TRIGGER_SPREAD_MS = REGISTRY.histogram("percipio.group_trigger_spread_ms")
+_GROUP_READ_ERRORS = REGISTRY.counter("percipio.group_read_errors")
+
+GROUP_ACQUISITION_MODES = ("software_trigger", "hardware_trigger")
+
+
+@dataclass
+class GroupFrameSet:
+    """
+    One synchronized capture of every camera of a group.
+
+    Attributes:
+        timestamp: time.monotonic() of the capture, shared by all views: the middle of the trigger
+            fan-out in "software_trigger" mode, the first arrival in "hardware_trigger" mode.
+        frames: Color image per camera.
+        depths: Depth image per camera, None for cameras without use_depth.
+        skew_ms: Per camera, how much later than the first camera its frame set arrived (ms).
+        trigger_spread_ms: Time between the first and the last software trigger (ms), 0 with
+            hardware triggers.
+        device_timestamps: Device timestamp (us) of every frame set. Device clocks are only
+            comparable across cameras when they are synchronized (PTP/NTP).
+    """
+
+    timestamp: float
+    frames: dict[str, NDArray[Any]] = field(default_factory=dict)
+    depths: dict[str, NDArray[Any] | None] = field(default_factory=dict)
+    skew_ms: dict[str, float] = field(default_factory=dict)
+    trigger_spread_ms: float = 0.0
+    device_timestamps: dict[str, int | None] = field(default_factory=dict)
+
+    @property
+    def max_skew_ms(self) -> float:
+        return max(self.skew_ms.values(), default=0.0)
+
+
+class PercipioCameraGroup:
+    """
+    Captures synchronized frame sets from several `PercipioCamera`s.
+
+    Instead of every camera capturing on its own read loop, the group fires the triggers of all
+    members back to back (software trigger) or waits for a shared external trigger (hardware
+    trigger), then collects and decodes the frame sets of all cameras in parallel. Every capture
+    is returned as one `GroupFrameSet` stamped with a single timestamp, with the arrival skew of
+    each camera measured (`percipio.group_skew_ms`).
+
+    The group owns the acquisition of its members: their own `async_read*()` must not be used
+    while the group is reading. All members need the same acquisition_mode, "software_trigger"
+    or "hardware_trigger".
+
+    Args:
+        cameras: Member cameras by name.
+    """
+
+    def __init__(self, cameras: dict[str, PercipioCamera]):
+        if not cameras:
+            raise ValueError("A camera group needs at least one camera.")
+        modes = {cam.acquisition_mode for cam in cameras.values()}
+        if len(modes) != 1 or not modes <= set(GROUP_ACQUISITION_MODES):
+            raise ValueError(
+                f"Grouped cameras must all use the same acquisition_mode in {GROUP_ACQUISITION_MODES}, "
+                f"but {sorted(modes)} are configured."
+            )
+        self.cameras = cameras
+        self.acquisition_mode = modes.pop()
+
+        self._executor: ThreadPoolExecutor | None = None
+
+        self.thread: Thread | None = None
+        self.stop_event: Event | None = None
+        self.frame_lock: Lock = Lock()
+        self.latest_set: GroupFrameSet | None = None
+        self.new_frame_event: Event = Event()
+        # timestamp of the set last returned by async_read()
+        self.frame_timestamp: float | None = None
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(self.cameras)})"
+
+    @property
+    def is_connected(self) -> bool:
+        return all(cam.is_connected for cam in self.cameras.values())
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.cameras), thread_name_prefix=f"{self}")
+        return self._executor
+
+    def connect(self) -> None:
+        """Connects, in parallel, the members that are not connected yet."""
+        executor = self._get_executor()
+        futures = [executor.submit(cam.connect) for cam in self.cameras.values() if not cam.is_connected]
+        wait(futures)
+        for future in futures:
+            future.result()
+
+    def read(self, timeout_ms: int = 200) -> GroupFrameSet:
+        """
+        Captures one synchronized frame set of all cameras.
+
+        Raises:
+            DeviceNotConnectedError: If a camera is not connected.
+            RuntimeError: If a camera runs its own read thread, or a frame set misses a stream.
+            TimeoutError: If a camera received no frame in time.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        self._check_members()
+
+        start_time = time.perf_counter()
+        software = self.acquisition_mode == "software_trigger"
+        trigger_start = time.monotonic()
+        if software:
+            # fan out first, before any (slow) read, so the captures are as close as possible
+            for cam in self.cameras.values():
+                cam._send_trigger()
+        trigger_end = time.monotonic()
+
+        executor = self._get_executor()
+        futures = {
+            name: executor.submit(cam._read_set, timeout_ms, None, False, False)
+            for name, cam in self.cameras.items()
+        }
+        wait(futures.values())
+
+        frame_set = GroupFrameSet(timestamp=0.0)
+        arrivals = {}
+        for name, future in futures.items():
+            color, depth, _ = future.result()
+            cam = self.cameras[name]
+            frame_set.frames[name] = color
+            frame_set.depths[name] = depth
+            frame_set.device_timestamps[name] = cam.device_timestamp
+            arrivals[name] = cam.capture_timestamp
+
+        first_arrival = min(arrivals.values())
+        frame_set.skew_ms = {name: (ts - first_arrival) * 1e3 for name, ts in arrivals.items()}
+        if software:
+            frame_set.timestamp = (trigger_start + trigger_end) / 2
+            frame_set.trigger_spread_ms = (trigger_end - trigger_start) * 1e3
+            _GROUP_TRIGGER_SPREAD_MS.observe(frame_set.trigger_spread_ms)
+        else:
+            frame_set.timestamp = first_arrival
+        _GROUP_SKEW_MS.observe(frame_set.max_skew_ms)
+        _GROUP_READ_MS.observe_since(start_time)
+
+        return frame_set
+
+    def _check_members(self) -> None:
+        busy = [name for name, cam in self.cameras.items() if cam.thread is not None]
+        if busy:
+            raise RuntimeError(f"{self}: cameras {busy} run their own read thread, which competes for frames.")
+
+    def _read_loop(self) -> None:
+        """
+        Internal loop run by the background thread for asynchronous reading.
+
+        Captures group frame sets back to back, stores the latest in latest_set and sets
+        new_frame_event. Stops on DeviceNotConnectedError or when a member starts its own read
+        thread, logs other errors and continues.
+        """
+        while not self.stop_event.is_set():
+            try:
+                self._check_members()
+            except RuntimeError as e:
+                logger.error(f"Stopping the background thread of {self}: {e}")
+                break
+            try:
+                frame_set = self.read(timeout_ms=500)
+                with self.frame_lock:
+                    self.latest_set = frame_set
+                self.new_frame_event.set()
+            except DeviceNotConnectedError:
+                break
+            except TimeoutError:
+                continue
+            except Exception as e:
+                _GROUP_READ_ERRORS.inc()
+                logger.warning(f"Error reading frame set in background thread for {self}: {e}")
+
+    def _start_read_thread(self) -> None:
+        """Starts or restarts the background read thread if it's not running."""
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=0.1)
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+        self.stop_event = Event()
+        self.thread = Thread(target=self._read_loop, args=(), name=f"{self}_read_loop")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _stop_read_thread(self) -> None:
+        """Signals the background read thread to stop and waits for it to join."""
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+
+        self.thread = None
+        self.stop_event = None
+
+    def async_read(self, timeout_ms: float = 200) -> GroupFrameSet:
+        """
+        Returns the latest frame set captured by the background thread, started on first call.
+
+        Waits at most `timeout_ms` for a set newer than the last one returned.
+
+        Raises:
+            DeviceNotConnectedError: If a camera is not connected.
+            RuntimeError: If a camera runs its own read thread.
+            TimeoutError: If no new frame set becomes available in time.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        self._check_members()
+
+        if self.thread is None or not self.thread.is_alive():
+            self._start_read_thread()
+
+        start_time = time.perf_counter()
+        while True:
+            remaining_s = timeout_ms / 1e3 - (time.perf_counter() - start_time)
+            if not self.new_frame_event.wait(timeout=max(remaining_s, 0)):
+                thread_alive = self.thread is not None and self.thread.is_alive()
+                raise TimeoutError(
+                    f"Timed out waiting for frame set from {self} after {timeout_ms} ms. "
+                    f"Read thread alive: {thread_alive}."
+                )
+            with self.frame_lock:
+                frame_set = self.latest_set
+                self.new_frame_event.clear()
+            if frame_set is not None and frame_set.timestamp != self.frame_timestamp:
+                break
+
+        self.frame_timestamp = frame_set.timestamp
+        return frame_set
+
+    def disconnect(self) -> None:
+        """Stops the background thread and disconnects the connected members."""
+        self._stop_read_thread()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for cam in self.cameras.values():
+            if cam.is_connected:
+                cam.disconnect()
+        logger.info(f"{self} disconnected.")
@@ -3,8 +3,9 @@ Provides the PercipioCamera class for capturing frames from Percipio cameras.
 """
 
 import logging
+import math
 import time
-from threading import Event, Lock, Thread
+from threading import Event, Lock, Thread, local
 from typing import Any
 
 import cv2  # type: ignore  # TODO: add type stubs for OpenCV
@@ -16,29 +17,83 @@ from lerobot.utils.errors import DeviceAlreadyConnectedError, DeviceNotConnected
 from lerobot.cameras.camera import Camera
 from lerobot.cameras.configs import ColorMode
 from lerobot.cameras.utils import get_cv2_rotation
+from percipio.buffer_pool import BufferPool
 from percipio.configuration_percipio import PercipioCameraConfig
-
-import pcammls
-from pcammls import * 
-import sys
-import os
+from percipio.depth_filters import DepthFilterChain, HoleFillFilter, SpeckleFilter, TemporalFilter
+from percipio.device_cache import DeviceCache, table_name
+from percipio.formats import select_format
+from percipio.pipeline import LatestQueue
+from percipio.pointcloud import PointCloudProjector
+from percipio.registration import DepthRegistration, calib_from_lists, calib_to_numpy, scale_intrinsic
+from percipio.sdk import (
+    SDK_LOCK,
+    device_ip,
+    find_device,
+    list_devices,
+    load_pcammls,
+    shared_device_event,
+    shared_sdk,
+)
+from percipio.undistortion import build_undistort_maps
+from zprobot_metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
-class PythonPercipioDeviceEvent(pcammls.DeviceEvent):
-    Offline = False
-
-    def __init__(self):
-        pcammls.DeviceEvent.__init__(self)
+# hot path metrics, see zprobot_metrics
+_TRIGGER_TO_FRAME_MS = REGISTRY.histogram("percipio.trigger_to_frame_ms")
+_FRAME_WAIT_MS = REGISTRY.histogram("percipio.frame_wait_ms")
+_DECODE_MS = REGISTRY.histogram("percipio.decode_ms")
+_DEPTH_RENDER_MS = REGISTRY.histogram("percipio.depth_render_ms")
+_POSTPROCESS_MS = REGISTRY.histogram("percipio.postprocess_ms")
+_REGISTRATION_MS = REGISTRY.histogram("percipio.registration_ms")
+_POINTCLOUD_MS = REGISTRY.histogram("percipio.pointcloud_ms")
+_ASYNC_READ_WAIT_MS = REGISTRY.histogram("percipio.async_read_wait_ms")
+_FRAMES = REGISTRY.counter("percipio.frames")
+_READ_ERRORS = REGISTRY.counter("percipio.read_errors")
+# background pipeline stages, see _read_loop() / _decode_loop()
+_QUEUE_WAIT_MS = REGISTRY.histogram("percipio.pipeline_queue_wait_ms")
+_PROCESS_MS = REGISTRY.histogram("percipio.pipeline_process_ms")
+_CAPTURE_TO_PUBLISH_MS = REGISTRY.histogram("percipio.pipeline_capture_to_publish_ms")
+_PIPELINE_DROPPED = REGISTRY.counter("percipio.pipeline_dropped")
+
+# np.rot90 turns of the cv2 rotations, for rotations folded into a strided copy
+_NP_ROT90 = {cv2.ROTATE_90_COUNTERCLOCKWISE: 1, cv2.ROTATE_180: 2, cv2.ROTATE_90_CLOCKWISE: 3}
+
+
+class _FrameBuffers:
+    """
+    Working memory of the frame path. Every thread decoding frames (the caller of read(), the
+    pipeline workers) gets its own, see PercipioCamera._buffers(): the decode targets, buffer
+    pools and scratch buffers are not thread-safe.
+
+    Decoding writes into one image_data per stream, whose memory as_nparray() views without
+    copying. Each frame is then converted/rotated (or copied) straight into an array from the
+    output pools, see BufferPool for when those arrays are recycled. `scratch` holds the
+    intermediate image when both color conversion and rotation apply, `work` the other
+    intermediate arrays, never returned to callers.
+    """
+
+    def __init__(self, sdk: Any, pool_size: int, generation: int):
+        self.generation = generation
+        # 解码目标缓冲区，每个数据流一个，所有帧复用
+        self.decode_targets: dict[int, Any] = {
+            sdk.PERCIPIO_STREAM_COLOR: sdk.image_data(),
+            sdk.PERCIPIO_STREAM_DEPTH: sdk.image_data(),
+        }
+        # 配准输出缓冲区
+        self.registration_target = sdk.image_data()
+        # 点云输出缓冲区
+        self.p3d = sdk.pointcloud_data_list()
+        self.color_pool = BufferPool(pool_size)
+        self.depth_pool = BufferPool(pool_size)
+        self.scratch: NDArray[Any] | None = None
+        self.work: dict[str, NDArray[Any]] = {}
+        # numpy registration and point cloud ray tables, built for the first frame sizes seen
+        self.registration: DepthRegistration | None = None
+        self.projector: PointCloudProjector | None = None
+        # depth filters of this thread, around the camera's shared temporal filter
+        self.depth_filters: DepthFilterChain | None = None
 
-    def run(self, handle, eventID):
-        if eventID==TY_EVENT_DEVICE_OFFLINE:
-          print('=== Event Callback: Device Offline!')
-          self.Offline = True
-        return 0
-
-    def IsOffline(self):
-        return self.Offline
 
 class PercipioCamera(Camera):
 
@@ -53,27 +108,95 @@ class PercipioCamera(Camera):
         super().__init__(config)
 
         self.config = config
+        self.serial_number_or_ip = config.serial_number_or_ip
 
         self.registration_mode = config.registration_mode
+        self.registration_target = config.registration_target
+        self.registration_backend = config.registration_backend
         self.color_mode = config.color_mode
         self.use_depth = config.use_depth
         self.warmup_s = config.warmup_s
-
+        self.acquisition_mode = config.acquisition_mode
+        self.undistort = config.undistort
+        self.depth_render = config.depth_render
+        self.crop = config.crop
+        self.output_format = config.output_format
+
+        # pcammls module and the process-wide PercipioSDK, loaded on first connect (see percipio.sdk)
+        self.sdk = None
         self.cl = None
         self.event = None
         self.handle = None
+        self.serial_number: str | None = None
+        # formats, calibration and derived tables of the connected camera, see percipio.device_cache
+        self.cache: DeviceCache | None = None
 
         self.thread: Thread | None = None
         self.stop_event: Event | None = None
         self.frame_lock: Lock = Lock()
         self.latest_frame: NDArray[Any] | None = None
+        # depth captured in the same frame set as latest_frame, when use_depth is enabled. Color and
+        # depth have their own new-frame events so async_read() and async_read_depth() consumers do
+        # not consume each other's notifications.
+        self.latest_depth: NDArray[Any] | None = None
         self.new_frame_event: Event = Event()
+        self.new_depth_event: Event = Event()
+        # point cloud of the same frame set, produced by the background thread with `pointcloud`
+        self.latest_pointcloud: tuple[NDArray[np.float32], NDArray[np.uint8] | None] | None = None
+        self.new_pointcloud_event: Event = Event()
+        # time.monotonic() capture times of the last frame read() got from the device, of
+        # latest_frame, and of the frame last returned by async_read()
+        self.capture_timestamp: float | None = None
+        self.latest_timestamp: float | None = None
+        self.frame_timestamp: float | None = None
+        self.device_timestamp: int | None = None
 
         self.rotation: int | None = get_cv2_rotation(config.rotation)
 
+        # width/height are the size of the returned (rotated) images, capture_width/capture_height
+        # the size the streams are negotiated for, see _configure_format()
+        self.capture_width, self.capture_height = self.width, self.height
+        if self.rotation in [cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE]:
+            self.capture_width, self.capture_height = self.height, self.width
+
+        # frame buffers of each decoding thread (see _FrameBuffers), reused across frames instead
+        # of allocated per read, and dropped at reconnect
+        self._local = local()
+        self._generation = 0
+
+        # background pipeline: acquisition thread (`thread`) -> _frame_queue -> decode workers
+        self.decode_workers = config.decode_workers
+        self._frame_queue: LatestQueue | None = None
+        self._workers: list[Thread] = []
+
+        # calibration ("depth"/"color" from calib_to_numpy, "color_rectified_intrinsic") and depth
+        # unit (mm), loaded at connect from the device cache when depth or undistort is enabled
+        self.calibration: dict[str, Any] = {}
+        self.depth_scale_unit: float = 1.0
+        # SDK calibration objects, only read from the device when an SDK backend needs them
+        self._sdk_calibs: dict[int, Any] = {}
+        # numpy registration tables by cache name, shared by the per thread DepthRegistration
+        self._registration_tables: dict[str, tuple[NDArray[Any], NDArray[Any]]] = {}
+        # state of the "temporal" depth filter, one per camera whichever thread decodes a frame
+        self._temporal_filter: TemporalFilter | None = None
+        # undistort + rotate remap tables of color frames (see percipio.undistortion), built at connect
+        self._undistort_maps: tuple[NDArray[Any], NDArray[Any]] | None = None
+        self._undistort_size: tuple[int, int] | None = None
 
     def __str__(self) -> str:
-        return f"{self.__class__.__name__}({self.registration_mode})"
+        return f"{self.__class__.__name__}({self.serial_number_or_ip or self.serial_number})"
+
+    @property
+    def frame_shape(self) -> tuple[int, int, int]:
+        """Shape of the color images returned: (h, w, 3), or (3, h, w) with a CHW `output_format`."""
+        if self.output_format == "hwc":
+            return (self.height, self.width, 3)
+        return (3, self.height, self.width)
+
+    @property
+    def depth_shape(self) -> tuple[int, int, int]:
+        """Shape of the depth images returned: (h, w, 1) uint16 mm, or (h, w, 3) with `depth_render`."""
+        return (self.height, self.width, 3 if self.depth_render else 1)
 
     @property
     def is_connected(self) -> bool:
@@ -84,49 +207,30 @@ class PercipioCamera(Camera):
         if self.is_connected:
             raise DeviceAlreadyConnectedError(f"{self} is already connected.")
 
-        self.cl = PercipioSDK()
+        self.sdk = load_pcammls()
+        self.cl = shared_sdk()
+        self.event = shared_device_event()
+
+        dev = find_device(self.serial_number_or_ip)
+        sn = dev.id
+        self.serial_number = sn
+        self.cache = DeviceCache(self.config.cache_dir, sn, dev.firmwareVersion)
+        self._sdk_calibs = {}
+
+        # opened under SDK_LOCK like Close: the shared instance does not serialize its device
+        # table itself. Configuring the streams, the slow part of the bring-up, still runs in
+        # parallel when several cameras connect from different threads.
+        with SDK_LOCK:
+            if self.serial_number_or_ip is not None and self.serial_number_or_ip == device_ip(dev):
+                #通过 IP 地址打开网络相机
+                handle = self.cl.OpenDeviceByIP(self.serial_number_or_ip)
+            else:
+                handle = self.cl.Open(sn)
+        if not self.cl.isValidHandle(handle):
+            raise ConnectionError(f"Failed to open {self}: {self.cl.TYGetLastErrorCodedescription()}")
+        self.event.Reset(handle)
+        self.handle = handle
         
-        dev_list = self.cl.ListDevice()
- 
-        for idx in range(len(dev_list)):
-            dev = dev_list[idx]
-            print ('{} -- {} \t {}'.format(idx,dev.id,dev.iface.id))
-        if  len(dev_list)==0:
-            print ('no device')
-            return
-        if len(dev_list) == 1:
-            selected_idx = 0 
-        else:
-            selected_idx  = int(input('select a device:'))
-        if selected_idx < 0 or selected_idx >= len(dev_list):
-            return
-
-        sn = dev_list[selected_idx].id
-        
-        self.handle = self.cl.Open(sn)
-        if not self.cl.isValidHandle(self.handle):
-            err = self.cl.TYGetLastErrorCodedescription()
-            print('no device found : ', end='')
-            print(err)
-            return
-
-        self.event = PythonPercipioDeviceEvent()
-        self.cl.DeviceRegiststerCallBackEvent(self.event)
-        
-        #该接口用于列举数据流的分辨率和图像格式。以 Color 数据流为例
-        color_fmt_list = self.cl.DeviceStreamFormatDump(self.handle, PERCIPIO_STREAM_COLOR)
-        if len(color_fmt_list) != 0:
-            print ('color image format list:')
-            for idx in range(len(color_fmt_list)):
-                fmt = color_fmt_list[idx]
-                print ('\t{} -size[{}x{}]\t-\t desc:{}'.format(idx, self.cl.Width(fmt), self.cl.Height(fmt), fmt.getDesc()))
-                print('\tSelect {}'.format(fmt.getDesc()))
-        #该接口用于配置数据流的分辨率，与 DeviceStreamFormatDump 联合使用
-        self.cl.DeviceStreamFormatConfig(self.handle, PERCIPIO_STREAM_COLOR, color_fmt_list[0])
-
-
-        #该接口用于设置相机的工作模式，0 代表 TY_TRIGGER_MODE_OFF，1 代表 TY_TRIGGER_MODE_SLAVE。示例如下：
-        self.cl.DeviceControlTriggerModeEnable(self.handle, 1)
         #该接口用于加载相机的配置文件（custom_block.bin 文件中保存了相机参数）
         err = self.cl.DeviceLoadDefaultParameters(self.handle)
         if err:
@@ -134,32 +238,144 @@ class PercipioCamera(Camera):
             print(self.cl.TYGetLastErrorCodedescription())
         else:
             print('Load default parameters successful')
+
+        # 数据流格式在默认参数之后设置，避免被 custom_block.bin 中保存的格式覆盖
+        color_size = self._configure_format(self.sdk.PERCIPIO_STREAM_COLOR, "color", self.config.color_pixel_format)
+        if self.width is None:
+            # no size requested: return frames at the size of the largest color format
+            self.capture_width, self.capture_height = color_size
+            self.width, self.height = color_size
+            if self.rotation in [cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE]:
+                self.width, self.height = self.height, self.width
+        if self.use_depth:
+            self._configure_format(self.sdk.PERCIPIO_STREAM_DEPTH, "depth")
+
+        #该接口用于设置相机的工作模式，0 代表 TY_TRIGGER_MODE_OFF，1 代表 TY_TRIGGER_MODE_SLAVE。
+        #在默认参数之后设置，避免被 custom_block.bin 中保存的触发模式覆盖。
+        # continuous: 相机按自身帧率连续出图; software/hardware trigger: 每次触发（软件或外部 IO）出一帧
+        trigger_enable = 0 if self.acquisition_mode == "continuous" else 1
+        err = self.cl.DeviceControlTriggerModeEnable(self.handle, trigger_enable)
+        if err:
+            raise RuntimeError(
+                f"{self} failed to set acquisition mode {self.acquisition_mode}: {self.cl.TYGetLastErrorCodedescription()}"
+            )
         #该接口用于使能数据流。使能 Color 和 Depth 数据流的示例如下：
         if self.use_depth:
             print('enable color and depth stream')
-            err = self.cl.DeviceStreamEnable(self.handle, PERCIPIO_STREAM_COLOR | PERCIPIO_STREAM_DEPTH)
+            err = self.cl.DeviceStreamEnable(self.handle, self.sdk.PERCIPIO_STREAM_COLOR | self.sdk.PERCIPIO_STREAM_DEPTH)
             if err:
                 print('device stream enable err:{}'.format(err))
                 return
         else:
             print('enable color stream')
-            err = self.cl.DeviceStreamEnable(self.handle, PERCIPIO_STREAM_COLOR)
+            err = self.cl.DeviceStreamEnable(self.handle, self.sdk.PERCIPIO_STREAM_COLOR)
             if err:
                 print('device stream enable err:{}'.format(err))
                 return
-        
+
+        # frame buffers and tables of an earlier connection may not fit the formats configured now
+        self._generation += 1
+        self._registration_tables = {}
+
+        if self.use_depth or self.undistort:
+            self._load_calibration()
+        if self.config.depth_filters and "temporal" in self.config.depth_filters:
+            self._temporal_filter = TemporalFilter(
+                self.config.temporal_alpha, self.config.temporal_delta_mm / self.depth_scale_unit
+            )
+        if self.undistort:
+            self._undistort_maps = self._undistort_tables(color_size)
+            self._undistort_size = color_size
+
         #开启数据流
         self.cl.DeviceStreamOn(self.handle)
 
         logger.info(f"{self} connected.")
 
+    def _configure_format(self, stream: int, name: str, pixel_format: str | None = None) -> tuple[int, int]:
+        """
+        Configures `stream` with the format closest to the capture size (see `select_format()`)
+        and returns the size (w, h) the device will deliver. The choice is cached per requested
+        size and pixel format.
+        """
+        size = None
+        if self.capture_width is not None:
+            size = (self.capture_width, self.capture_height)
+            if self.crop is not None:
+                # the crop has to cover the capture size, which sets the size of the full frame
+                size = (math.ceil(size[0] / self.crop[3]), math.ceil(size[1] / self.crop[2]))
+        key = f"{name}_format" if size is None else f"{name}_format_{size[0]}x{size[1]}"
+        if pixel_format is not None:
+            key = f"{key}_{pixel_format}"
+
+        fmt_value = self.cache.get(key)
+        if fmt_value is None:
+            #该接口用于列举数据流的分辨率和图像格式
+            fmt_list = self.cl.DeviceStreamFormatDump(self.handle, stream)
+            print('{} image format list:'.format(name))
+            for idx in range(len(fmt_list)):
+                fmt = fmt_list[idx]
+                print('\t{} -size[{}x{}]\t-\t desc:{}'.format(idx, self.cl.Width(fmt), self.cl.Height(fmt), fmt.getDesc()))
+            try:
+                fmt = select_format(self.sdk, self.cl, fmt_list, size, pixel_format)
+            except ValueError as e:
+                raise RuntimeError(f"{self} cannot configure the {name} stream: {e}") from e
+            print('\tSelect {}'.format(fmt.getDesc()))
+            self.cache.set(key, int(fmt.getValue()))
+        else:
+            # 格式已缓存：按缓存的图像模式构造格式，跳过 DeviceStreamFormatDump
+            fmt = self.sdk.TY_ENUM_ENTRY()
+            fmt.value = fmt_value
+        #该接口用于配置数据流的分辨率，与 DeviceStreamFormatDump 联合使用
+        err = self.cl.DeviceStreamFormatConfig(self.handle, stream, fmt)
+        if err:
+            raise RuntimeError(
+                f"{self} failed to configure the {name} stream format: {self.cl.TYGetLastErrorCodedescription()}"
+            )
+        return (int(self.cl.Width(fmt)), int(self.cl.Height(fmt)))
+
+    def _load_calibration(self) -> None:
+        """
+        Loads `calibration` and `depth_scale_unit` from the device cache, or from the device. The
+        SDK calibration objects are read here too when an "sdk" backend uses them, so no decode
+        worker reads from the device while the acquisition thread streams.
+        """
+        cached = self.cache.get("calibration")
+        sdk_registration = self.registration_mode and self.registration_backend == "sdk"
+        sdk_pointcloud = self.use_depth and self.config.pointcloud_backend == "sdk"
+        if cached is None or sdk_registration or sdk_pointcloud:
+            #读取标定参数，SDK 配准和点云接口需要
+            self._sdk_calibs = {
+                stream: self.cl.DeviceReadCalibData(self.handle, stream)
+                for stream in (self.sdk.PERCIPIO_STREAM_DEPTH, self.sdk.PERCIPIO_STREAM_COLOR)
+            }
+        if cached is None:
+            #读取 Depth 和 Color 的标定参数、深度单位以及 Color 去畸变后的内参
+            rectified = self.cl.DeviceReadRectifiedIntrData(self.handle, self.sdk.PERCIPIO_STREAM_COLOR)
+            cached = {
+                "depth": calib_to_numpy(self._sdk_calib(self.sdk.PERCIPIO_STREAM_DEPTH)),
+                "color": calib_to_numpy(self._sdk_calib(self.sdk.PERCIPIO_STREAM_COLOR)),
+                "color_rectified_intrinsic": list(rectified.Data()),
+                "depth_scale_unit": float(self.cl.DeviceReadCalibDepthScaleUnit(self.handle)),
+            }
+            self.cache.set("calibration", cached)
+
+        self.calibration = {
+            "depth": calib_from_lists(cached["depth"]),
+            "color": calib_from_lists(cached["color"]),
+            "color_rectified_intrinsic": np.asarray(cached["color_rectified_intrinsic"], dtype=np.float64).reshape(3, 3),
+        }
+        self.depth_scale_unit = cached["depth_scale_unit"]
+
+    def _sdk_calib(self, stream: int) -> Any:
+        """Returns the SDK calibration object of `stream`, read at connect by `_load_calibration`."""
+        return self._sdk_calibs[stream]
+
     @staticmethod
     def find_cameras() -> list[dict[str, Any]]:
         found_cameras_info = []
-        cl = PercipioSDK()
-        
-        dev_list = cl.ListDevice()
- 
+        dev_list = list_devices(refresh=True)
+
         if len(dev_list)==0:
             print ('no device')
             return found_cameras_info
@@ -170,6 +386,7 @@ class PercipioCamera(Camera):
             camera_info = {
                 "id":dev.id,
                 "dev.iface.id":dev.iface.id,
+                "ip":device_ip(dev),
                 "vendorName":dev.vendorName,
                 "modelName":dev.modelName,
                 "hardwareVersion":dev.hardwareVersion,
@@ -179,6 +396,268 @@ class PercipioCamera(Camera):
 
         return found_cameras_info
 
+    def _send_trigger(self) -> None:
+        """Sends a software trigger, the triggered frame set is then read with `_grab_frames(send_trigger=False)`."""
+        #该接口用于发送软触发信号
+        self.cl.DeviceControlTriggerModeSendTriggerSignal(self.handle)
+
+    def _grab_frames(self, timeout_ms: int, send_trigger: bool = True) -> Any:
+        """
+        Returns the next frame set from the device according to `acquisition_mode`.
+
+        In "software_trigger" mode a trigger is sent first (unless `send_trigger` is False, e.g.
+        when a `PercipioCameraGroup` fired it) and the frame is waited for without timeout limit,
+        as the capture was requested. In "continuous" and "hardware_trigger" modes the next frame
+        pushed by the device is waited for at most `timeout_ms`. The host arrival time is stored in
+        `capture_timestamp`, the device timestamp (us) of the frame set in `device_timestamp`.
+
+        Raises:
+            RuntimeError: If the device went offline.
+            TimeoutError: If no frame arrived in time.
+        """
+        if self.event.IsOffline(self.handle):
+            raise RuntimeError(f"{self}: device offline!")
+
+        start_time = time.perf_counter()
+        if self.acquisition_mode == "software_trigger":
+            if send_trigger:
+                self._send_trigger()
+            image_list = self.cl.DeviceStreamRead(self.handle, 20000)
+            _TRIGGER_TO_FRAME_MS.observe_since(start_time)
+        else:
+            image_list = self.cl.DeviceStreamRead(self.handle, int(timeout_ms))
+            _FRAME_WAIT_MS.observe_since(start_time)
+        self.capture_timestamp = time.monotonic()
+
+        if len(image_list) == 0:
+            raise TimeoutError(f"{self} received no frame within {timeout_ms} ms ({self.acquisition_mode}).")
+        self.device_timestamp = image_list[0].timestamp
+        return image_list
+
+    def _find_frame(self, image_list: Any, stream_id: int) -> Any:
+        """Returns the frame of `stream_id` in a frame set, or None."""
+        for i in range(len(image_list)):
+            if image_list[i].streamID == stream_id:
+                return image_list[i]
+        return None
+
+    def _decode_color_raw(self, frame: Any) -> Any:
+        """Decodes a color frame into the color decode target and returns it."""
+        rgb_image = self._buffers().decode_targets[self.sdk.PERCIPIO_STREAM_COLOR]
+        #该接口用于解析 Color 图
+        t = time.perf_counter()
+        self.cl.DeviceStreamImageDecode(frame, rgb_image)
+        _DECODE_MS.observe_since(t)
+        return rgb_image
+
+    def _decode_color(self, frame: Any, color_mode: ColorMode | None = None) -> NDArray[Any]:
+        """Decodes and postprocesses a color frame into a pooled array."""
+        arr = self._decode_color_raw(frame).as_nparray()
+        t = time.perf_counter()
+        color_image_processed = self._postprocess_image(arr, color_mode)
+        _POSTPROCESS_MS.observe_since(t)
+        _FRAMES.inc()
+        return color_image_processed
+
+    def _decode_depth(self, frame: Any) -> NDArray[Any]:
+        """
+        Postprocesses a depth frame into a pooled array, as uint16 millimeters or, with
+        `depth_render`, as the SDK colormap rendering.
+        """
+        if self.depth_render:
+            depth_render = self._buffers().decode_targets[self.sdk.PERCIPIO_STREAM_DEPTH]
+            #该接口用于解析和渲染 Depth 图（仅用于调试显示）
+            t = time.perf_counter()
+            self.cl.DeviceStreamDepthRender(frame, depth_render)
+            arr = depth_render.as_nparray()
+            _DEPTH_RENDER_MS.observe_since(t)
+        else:
+            arr = self._to_mm(frame.as_nparray())
+        t = time.perf_counter()
+        depth_map_processed = self._postprocess_image(arr, depth_frame=True)
+        _POSTPROCESS_MS.observe_since(t)
+        return depth_map_processed
+
+    def _filter_depth(self, depth_frame: Any) -> None:
+        """Runs the configured depth filters on a raw depth frame, in place."""
+        if not self.config.depth_filters:
+            return
+        buffers = self._buffers()
+        if buffers.depth_filters is None:
+            stages = {
+                "speckle": lambda: SpeckleFilter(self.cl, self.config.speckle_max_size, self.config.speckle_max_diff),
+                "temporal": lambda: self._temporal_filter,
+                "hole_fill": lambda: HoleFillFilter(self.config.hole_fill_radius),
+            }
+            buffers.depth_filters = DepthFilterChain([(name, stages[name]()) for name in self.config.depth_filters])
+        buffers.depth_filters(depth_frame, depth_frame.as_nparray(), depth_frame.timestamp)
+
+    def _numpy_registration(self, depth_size: tuple[int, int], color_size: tuple[int, int]) -> DepthRegistration:
+        """
+        Returns the numpy registration of the calling thread for these frame sizes. The tables
+        are built once and shared by all threads.
+        """
+        buffers = self._buffers()
+        reg = buffers.registration
+        if reg is None or reg.depth_size != depth_size or reg.color_size != color_size:
+            name = table_name("registration", depth_size, color_size, self.depth_scale_unit)
+            tables = self._registration_tables.get(name)
+            if tables is None:
+                arrays = self.cache.load_arrays(name)
+                tables = None if arrays is None else (arrays["a"], arrays["b"])
+            reg = DepthRegistration(
+                self.calibration["depth"],
+                self.calibration["color"],
+                depth_size,
+                color_size,
+                self.depth_scale_unit,
+                tables=tables,
+            )
+            if tables is None:
+                self.cache.save_arrays(name, a=reg.tables[0], b=reg.tables[1])
+            self._registration_tables[name] = reg.tables
+            buffers.registration = reg
+        return reg
+
+    def _undistort_tables(self, size: tuple[int, int]) -> tuple[NDArray[Any], NDArray[Any]]:
+        """
+        Returns the undistort + crop + resize + rotate remap tables of color frames of `size` (w, h)
+        to the capture size, cached.
+        """
+        rotation = -1 if self.rotation is None else self.rotation
+        out_size = (self.capture_width, self.capture_height)
+        crop = None if self.crop is None else self._crop_rect(*size)
+        name = table_name("undistort", size, out_size, rotation, -1 if crop is None else crop)
+        tables = self.cache.load_arrays(name)
+        if tables is not None:
+            return tables["map1"], tables["map2"]
+
+        maps = build_undistort_maps(
+            self.calibration["color"], self.calibration["color_rectified_intrinsic"], size, self.rotation, out_size, crop
+        )
+        self.cache.save_arrays(name, map1=maps[0], map2=maps[1])
+        return maps
+
+    def _buffers(self) -> _FrameBuffers:
+        """Returns the frame buffers of the calling thread, created on its first frame after connect."""
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None or buffers.generation != self._generation:
+            buffers = self._local.buffers = _FrameBuffers(self.sdk, self.config.buffer_pool_size, self._generation)
+        return buffers
+
+    def _work_buffer(self, key: str, shape: tuple[int, ...], dtype: Any) -> NDArray[Any]:
+        """Returns the reusable intermediate array `key`, reallocated only if the layout changed."""
+        work = self._buffers().work
+        buf = work.get(key)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = work[key] = np.empty(shape, dtype)
+        return buf
+
+    def _to_mm(self, raw: NDArray[Any]) -> NDArray[Any]:
+        """Returns a raw depth image as (h, w, 1) uint16 millimeters, scaled by `depth_scale_unit`."""
+        if self.depth_scale_unit == 1.0:
+            return raw
+        scaled = self._work_buffer("depth_mm", raw.shape, raw.dtype)
+        np.multiply(raw, self.depth_scale_unit, out=scaled, casting="unsafe")
+        return scaled
+
+    def _align(self, color_frame: Any, depth_frame: Any) -> tuple[NDArray[Any], NDArray[Any], Any, Any]:
+        """
+        Decodes a color/depth pair aligned to `registration_target`.
+
+        Returns:
+            tuple: Raw (not postprocessed) color image, depth in uint16 millimeters (h, w, 1), and
+            the SDK depth image with the stream of its calibration for
+            `DeviceStreamMapDepthImageToPoint3D` (None when the depth only exists as a numpy array). The arrays are working memory, valid
+            until the next frame set.
+        """
+        depth_size = (depth_frame.width, depth_frame.height)
+        color_size = (color_frame.width, color_frame.height)
+        use_sdk = self.registration_backend == "sdk"
+        if use_sdk:
+            depth_calib = self._sdk_calib(self.sdk.PERCIPIO_STREAM_DEPTH)
+            color_calib = self._sdk_calib(self.sdk.PERCIPIO_STREAM_COLOR)
+
+        registration_target = self._buffers().registration_target
+        if self.registration_target == "color":
+            color_raw = self._decode_color_raw(color_frame).as_nparray()
+            t = time.perf_counter()
+            if use_sdk:
+                #该接口用于将 Depth 图映射到 Color 坐标系
+                self.cl.DeviceStreamMapDepthImageToColorCoordinate(
+                    depth_calib, depth_frame, self.depth_scale_unit, color_calib,
+                    color_frame.width, color_frame.height, registration_target,
+                )  # fmt: skip
+                depth_mm = self._to_mm(registration_target.as_nparray())
+                sdk_depth = (registration_target, self.sdk.PERCIPIO_STREAM_COLOR)
+            else:
+                depth_mm = self._numpy_registration(depth_size, color_size).depth_to_color(
+                    depth_frame.as_nparray(),
+                    out=self._work_buffer("registered_depth", (color_size[1], color_size[0], 1), np.uint16),
+                )
+                sdk_depth = None
+            _REGISTRATION_MS.observe_since(t)
+            return color_raw, depth_mm, *(sdk_depth or (None, None))
+
+        rgb_image = self._decode_color_raw(color_frame)
+        t = time.perf_counter()
+        if use_sdk:
+            #该接口用于将 Color 图映射到 Depth 坐标系
+            self.cl.DeviceStreamMapRGBImageToDepthCoordinate(
+                depth_calib, depth_frame, self.depth_scale_unit, color_calib,
+                rgb_image, registration_target,
+            )  # fmt: skip
+            color_raw = registration_target.as_nparray()
+        else:
+            color_raw = self._numpy_registration(depth_size, color_size).color_to_depth(
+                rgb_image.as_nparray(),
+                depth_frame.as_nparray(),
+                out=self._work_buffer("registered_color", (depth_size[1], depth_size[0], 3), np.uint8),
+            )
+        _REGISTRATION_MS.observe_since(t)
+        return color_raw, self._to_mm(depth_frame.as_nparray()), depth_frame, self.sdk.PERCIPIO_STREAM_DEPTH
+
+    def _pointcloud_projector(self, size: tuple[int, int]) -> PointCloudProjector:
+        """Returns the point cloud projector of the calling thread for depth images of `size`."""
+        buffers = self._buffers()
+        proj = buffers.projector
+        if proj is None or proj.size != size:
+            registered_to_color = self.registration_mode and self.registration_target == "color"
+            calib = self.calibration["color" if registered_to_color else "depth"]
+            intrinsic = scale_intrinsic(calib["intrinsic"], (calib["width"], calib["height"]), size)
+            proj = PointCloudProjector(
+                intrinsic,
+                size,
+                stride=self.config.pointcloud_stride,
+                box=self.config.pointcloud_box,
+                voxel_size=self.config.pointcloud_voxel_size,
+                pool_size=self.config.buffer_pool_size,
+            )
+            buffers.projector = proj
+        return proj
+
+    def _compute_pointcloud(
+        self, depth_mm: NDArray[Any], colors: NDArray[Any] | None, sdk_depth: Any, calib_stream: int | None
+    ) -> tuple[NDArray[np.float32], NDArray[np.uint8] | None]:
+        """
+        Builds the point cloud of an aligned depth image with the configured backend. The sdk
+        backend maps `sdk_depth`, the same image as an SDK image_data, with the calibration of
+        `calib_stream`.
+        """
+        t = time.perf_counter()
+        proj = self._pointcloud_projector((depth_mm.shape[1], depth_mm.shape[0]))
+        if self.config.pointcloud_backend == "sdk" and sdk_depth is not None:
+            #该接口用于将 Depth 图转换为点云（单位 mm）
+            sdk_calib = self._sdk_calib(calib_stream)
+            p3d = self._buffers().p3d
+            self.cl.DeviceStreamMapDepthImageToPoint3D(sdk_depth, sdk_calib, self.depth_scale_unit, p3d)
+            cloud = proj.from_points(p3d.as_nparray(), colors)
+        else:
+            # also used when depth was registered with numpy and has no SDK image
+            cloud = proj.from_depth(depth_mm, colors)
+        _POINTCLOUD_MS.observe_since(t)
+        return cloud
+
     def read_depth(self, timeout_ms: int = 200) -> NDArray[Any]:
 
         if not self.is_connected:
@@ -187,24 +666,18 @@ class PercipioCamera(Camera):
             raise RuntimeError(
                 f"Failed to capture depth frame '.read_depth()'. Depth stream is not enabled for {self}."
             )
+        if self.registration_mode:
+            # registration needs both frames of the set
+            return self.read_rgbd(timeout_ms=timeout_ms)[1]
 
         start_time = time.perf_counter()
 
-        if self.event.IsOffline():
-            raise RuntimeError(f"{self}: device offline!")
-
-        self.cl.DeviceControlTriggerModeSendTriggerSignal(self.handle)
-        image_list = self.cl.DeviceStreamRead(self.handle, 20000)
-        depth_render = image_data()
-        depth_map_processed = []
-        for i in range(len(image_list)):
-            frame = image_list[i]
-            arr = frame.as_nparray()
-            if frame.streamID == PERCIPIO_STREAM_DEPTH:
-               #该接口用于解析和渲染 Depth 图
-               self.cl.DeviceStreamDepthRender(frame, depth_render)
-               arr = depth_render.as_nparray()
-               depth_map_processed = self._postprocess_image(arr, depth_frame=True)
+        image_list = self._grab_frames(timeout_ms)
+        frame = self._find_frame(image_list, self.sdk.PERCIPIO_STREAM_DEPTH)
+        if frame is None:
+            raise RuntimeError(f"{self} frame set has no depth frame.")
+        self._filter_depth(frame)
+        depth_map_processed = self._decode_depth(frame)
 
         read_duration_ms = (time.perf_counter() - start_time) * 1e3
         logger.debug(f"{self} read took: {read_duration_ms:.1f}ms")
@@ -215,49 +688,163 @@ class PercipioCamera(Camera):
 
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
+        if self.registration_mode and self.registration_target == "depth":
+            # color is mapped into the depth image, which needs the depth frame of the set
+            return self.read_rgbd(color_mode, timeout_ms)[0]
 
         start_time = time.perf_counter()
 
-        if self.event.IsOffline():
-            raise RuntimeError(f"{self}: device offline!")
-
-        self.cl.DeviceControlTriggerModeSendTriggerSignal(self.handle)
-        image_list = self.cl.DeviceStreamRead(self.handle, 20000)
-        rgb_image = image_data()
-        color_image_processed = []
-        for i in range(len(image_list)):
-            frame = image_list[i]
-            arr = frame.as_nparray()
-            if frame.streamID == PERCIPIO_STREAM_COLOR:
-               #该接口用于解析 Color 图
-               self.cl.DeviceStreamImageDecode(frame, rgb_image)
-               arr = rgb_image.as_nparray()
-               color_image_processed = self._postprocess_image(arr, color_mode)
-
+        image_list = self._grab_frames(timeout_ms)
+        frame = self._find_frame(image_list, self.sdk.PERCIPIO_STREAM_COLOR)
+        if frame is None:
+            raise RuntimeError(f"{self} frame set has no color frame.")
+        color_image_processed = self._decode_color(frame, color_mode)
 
         read_duration_ms = (time.perf_counter() - start_time) * 1e3
         logger.debug(f"{self} read took: {read_duration_ms:.1f}ms")
 
         return color_image_processed
 
+    def read_rgbd(
+        self, color_mode: ColorMode | None = None, timeout_ms: int = 200
+    ) -> tuple[NDArray[Any], NDArray[Any]]:
+        """
+        Captures color and depth from a single frame set.
+
+        Both images come from the same trigger (or the same pushed frame set), so they are a
+        consistent pair and cost one capture instead of two. Their shared capture time is
+        stored in `capture_timestamp`.
+
+        Returns:
+            tuple: The processed color image and depth image.
+
+        Raises:
+            DeviceNotConnectedError: If the camera is not connected.
+            RuntimeError: If depth is not enabled or the frame set misses a stream.
+            TimeoutError: If no frame set arrived in time.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        if not self.use_depth:
+            raise RuntimeError(
+                f"Failed to capture depth frame '.read_rgbd()'. Depth stream is not enabled for {self}."
+            )
+
+        start_time = time.perf_counter()
+
+        color_image_processed, depth_map_processed, _ = self._read_set(timeout_ms, color_mode)
+
+        read_duration_ms = (time.perf_counter() - start_time) * 1e3
+        logger.debug(f"{self} read_rgbd took: {read_duration_ms:.1f}ms")
+
+        return color_image_processed, depth_map_processed
+
+    def read_pointcloud(self, timeout_ms: int = 200) -> tuple[NDArray[np.float32], NDArray[np.uint8] | None]:
+        """
+        Captures a frame set and returns its point cloud.
+
+        Points are float32 (N, 3) in meters, in the frame of the returned depth image: the color
+        camera with registration_target="color", otherwise the depth camera. Invalid points are
+        dropped and the pointcloud_stride / pointcloud_box / pointcloud_voxel_size options are
+        applied. The arrays come from a buffer pool (see `BufferPool`).
+
+        Returns:
+            tuple: The points, and their uint8 RGB colors with pointcloud_colors (else None).
+
+        Raises:
+            DeviceNotConnectedError: If the camera is not connected.
+            RuntimeError: If depth is not enabled or the frame set misses a stream.
+            TimeoutError: If no frame set arrived in time.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        if not self.use_depth:
+            raise RuntimeError(
+                f"Failed to capture point cloud '.read_pointcloud()'. Depth stream is not enabled for {self}."
+            )
+
+        _, _, cloud = self._read_set(timeout_ms, pointcloud=True)
+        return cloud
+
+    def _read_set(
+        self,
+        timeout_ms: int,
+        color_mode: ColorMode | None = None,
+        pointcloud: bool = False,
+        send_trigger: bool = True,
+    ) -> tuple[NDArray[Any], NDArray[Any] | None, tuple[NDArray[np.float32], NDArray[np.uint8] | None] | None]:
+        """
+        Grabs one frame set, returns its processed color, its depth (None without use_depth) and,
+        if asked, its point cloud. See `_grab_frames()` for `send_trigger`.
+        """
+        image_list = self._grab_frames(timeout_ms, send_trigger)
+        return self._process_set(image_list, color_mode, pointcloud)
+
+    def _process_set(
+        self, image_list: Any, color_mode: ColorMode | None = None, pointcloud: bool = False
+    ) -> tuple[NDArray[Any], NDArray[Any] | None, tuple[NDArray[np.float32], NDArray[np.uint8] | None] | None]:
+        """Decodes and postprocesses a frame set from `_grab_frames()`, see `_read_set()`."""
+        if not self.use_depth:
+            color_frame = self._find_frame(image_list, self.sdk.PERCIPIO_STREAM_COLOR)
+            if color_frame is None:
+                raise RuntimeError(f"{self} frame set has no color frame.")
+            return self._decode_color(color_frame, color_mode), None, None
+
+        color_frame = self._find_frame(image_list, self.sdk.PERCIPIO_STREAM_COLOR)
+        depth_frame = self._find_frame(image_list, self.sdk.PERCIPIO_STREAM_DEPTH)
+        if color_frame is None or depth_frame is None:
+            raise RuntimeError(f"{self} frame set misses the color or the depth frame.")
+        self._filter_depth(depth_frame)
+
+        cloud = None
+        if self.registration_mode:
+            color_raw, depth_mm, sdk_depth, calib_stream = self._align(color_frame, depth_frame)
+            t = time.perf_counter()
+            color_image_processed = self._postprocess_image(color_raw, color_mode)
+            depth_map_processed = self._postprocess_image(depth_mm, depth_frame=True)
+            _POSTPROCESS_MS.observe_since(t)
+            _FRAMES.inc()
+            if pointcloud:
+                colors = color_raw if self.config.pointcloud_colors else None
+                cloud = self._compute_pointcloud(depth_mm, colors, sdk_depth, calib_stream)
+        else:
+            color_image_processed = self._decode_color(color_frame, color_mode)
+            depth_map_processed = self._decode_depth(depth_frame)
+            if pointcloud:
+                depth_mm = self._to_mm(depth_frame.as_nparray())
+                cloud = self._compute_pointcloud(depth_mm, None, depth_frame, self.sdk.PERCIPIO_STREAM_DEPTH)
+
+        return color_image_processed, depth_map_processed, cloud
+
     def _postprocess_image(
         self, image: NDArray[Any], color_mode: ColorMode | None = None, depth_frame: bool = False
     ) -> NDArray[Any]:
         """
-        Applies color conversion, dimension validation, and rotation to a raw color frame.
+        Applies dimension validation, cropping, resizing, color conversion and rotation to a raw color frame.
+
+        The result is written into an array of the color (or depth) buffer pool, so `image` may be
+        a view on SDK memory that is overwritten by the next decode. The stages run in the order
+        crop -> resize -> color -> rotate, so everything after the (view only) crop touches the
+        small output image: frames are only resized when the negotiated stream format does not
+        deliver the capture size natively, and with `output_format` "chw"/"chw_float16" color
+        order, rotation, layout and scaling are a single strided pass. With `undistort`,
+        undistortion, cropping, resizing and rotation are a single remap pass. Undistortion also
+        applies to depth registered to the color image, cropping to registered depth, so they
+        stay aligned with the color.
 
         Args:
-            image (np.ndarray): The raw image frame (expected RGB format from RealSense).
+            image (np.ndarray): The raw image frame (RGB as decoded by the SDK).
             color_mode (Optional[ColorMode]): The target color mode (RGB or BGR). If None,
                                              uses the instance's default `self.color_mode`.
 
         Returns:
-            np.ndarray: The processed image frame according to `self.color_mode` and `self.rotation`.
+            np.ndarray: The processed image frame according to `self.color_mode`, `self.rotation`
+            and, for color frames, `output_format`.
 
         Raises:
             ValueError: If the requested `color_mode` is invalid.
-            RuntimeError: If the raw frame dimensions do not match the configured
-                          `width` and `height`.
+            RuntimeError: If the channels are not 3, or the frame does not match the size the
+                          undistortion tables were built for.
         """
 
         if color_mode and color_mode not in (ColorMode.RGB, ColorMode.BGR):
@@ -266,73 +853,235 @@ class PercipioCamera(Camera):
             )
 
         if depth_frame:
-            h, w = image.shape
+            h, w = image.shape[:2]
         else:
             h, w, c = image.shape
 
             if c != 3:
                 raise RuntimeError(f"{self} frame channels={c} do not match expected 3 channels (RGB/BGR).")
 
-        processed_image = image
-        if self.color_mode == ColorMode.BGR:
-            processed_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        convert = not depth_frame and (color_mode or self.color_mode) == ColorMode.BGR
+        rotate = self.rotation in [cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE, cv2.ROTATE_180]
+        chw = not depth_frame and self.output_format != "hwc"
 
-        if self.rotation in [cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE, cv2.ROTATE_180]:
-            processed_image = cv2.rotate(processed_image, self.rotation)
+        cw, ch = self.capture_width, self.capture_height
+        out_hw = (cw, ch) if rotate and self.rotation != cv2.ROTATE_180 else (ch, cw)
+        if chw:
+            out_shape, out_dtype = (3,) + out_hw, np.float16 if self.output_format == "chw_float16" else np.uint8
+        else:
+            out_shape, out_dtype = out_hw + image.shape[2:], image.dtype
+        buffers = self._buffers()
+        pool = buffers.depth_pool if depth_frame else buffers.color_pool
+
+        in_color_frame = not depth_frame or (self.registration_mode and self.registration_target == "color")
+        if self._undistort_maps is not None and in_color_frame:
+            map1, map2 = self._undistort_maps
+            if (w, h) != self._undistort_size:
+                raise RuntimeError(
+                    f"{self} frame size {w}x{h} does not match the undistortion tables built at connect."
+                )
+            if chw:
+                remapped = self._work_buffer("remapped", out_hw + image.shape[2:], image.dtype)
+            else:
+                remapped = pool.acquire(out_shape, image.dtype)
+            # nearest for depth, interpolating would invent depth at object edges
+            interpolation = cv2.INTER_NEAREST if depth_frame else cv2.INTER_LINEAR
+            cv2.remap(
+                image.reshape(h, w, -1), map1, map2, interpolation,
+                dst=remapped.reshape(out_hw[0], out_hw[1], -1),
+            )  # fmt: skip
+            if chw:
+                # rotated by the remap already
+                return self._to_chw(remapped, convert, None, pool.acquire(out_shape, out_dtype))
+            if convert:
+                cv2.cvtColor(remapped, cv2.COLOR_RGB2BGR, dst=remapped)
+            return remapped
+
+        if self.crop is not None and (not depth_frame or self.registration_mode):
+            top, left, h, w = self._crop_rect(w, h)
+            image = image[top : top + h, left : left + w]
+
+        if (w, h) != (cw, ch):
+            # nearest for depth like above, area averaging for color. Downscaling comes first so
+            # the conversion and rotation touch fewer pixels.
+            interpolation = cv2.INTER_NEAREST if depth_frame else cv2.INTER_AREA
+            if not (convert or rotate or chw):
+                processed_image = pool.acquire(out_shape, image.dtype)
+                cv2.resize(image, (cw, ch), dst=processed_image.reshape(ch, cw, -1), interpolation=interpolation)
+                return processed_image
+            resized = self._work_buffer(
+                "resized_depth" if depth_frame else "resized_color", (ch, cw) + image.shape[2:], image.dtype
+            )
+            cv2.resize(image, (cw, ch), dst=resized.reshape(ch, cw, -1), interpolation=interpolation)
+            image = resized
+
+        if chw:
+            return self._to_chw(image, convert, self.rotation, pool.acquire(out_shape, out_dtype))
+
+        processed_image = pool.acquire(out_shape, image.dtype)
+
+        if convert and rotate:
+            if buffers.scratch is None or buffers.scratch.shape != image.shape:
+                buffers.scratch = np.empty_like(image)
+            cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=buffers.scratch)
+            cv2.rotate(buffers.scratch, self.rotation, dst=processed_image)
+        elif convert:
+            cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=processed_image)
+        elif rotate:
+            cv2.rotate(image, self.rotation, dst=processed_image)
+        else:
+            np.copyto(processed_image, image)
 
         return processed_image
 
+    @staticmethod
+    def _to_chw(image: NDArray[Any], convert: bool, rotation: int | None, out: NDArray[Any]) -> NDArray[Any]:
+        """
+        Writes an (h, w, 3) RGB image into `out` as CHW in one strided pass: rotation, channel
+        order and layout are views of `image`, float16 output is scaled to [0, 1] on the way.
+        """
+        view = image if rotation is None else np.rot90(image, _NP_ROT90[rotation])
+        view = view.transpose(2, 0, 1)
+        if convert:
+            view = view[::-1]
+        if out.dtype == np.uint8:
+            np.copyto(out, view)
+        else:
+            np.multiply(view, np.float32(1 / 255), out=out, dtype=np.float32, casting="unsafe")
+        return out
+
+    def _crop_rect(self, w: int, h: int) -> tuple[int, int, int, int]:
+        """Returns `crop` as (top, left, height, width) in pixels of a (w, h) frame."""
+        top, left, crop_h, crop_w = self.crop
+        top, left = round(top * h), round(left * w)
+        return top, left, max(1, min(round(crop_h * h), h - top)), max(1, min(round(crop_w * w), w - left))
+
     def _read_loop(self) -> None:
         """
-        Internal loop run by the background thread for asynchronous reading.
+        Internal loop run by the background thread for asynchronous reading, the acquisition
+        stage of the pipeline.
 
         On each iteration:
-        1. Reads a color frame with 500ms timeout
-        2. Stores result in latest_frame (thread-safe)
-        3. Sets new_frame_event to notify listeners
-
-        Stops on DeviceNotConnectedError, logs other errors and continues.
+        1. Grabs a frame set with 500ms timeout. In "continuous" and "hardware_trigger" modes this
+           consumes frames as the device pushes them, no trigger round trip.
+        2. Hands it to the decode workers through _frame_queue, dropping the oldest pending set
+           when they fall behind, and starts over: the next set is acquired while this one is
+           decoded. With decode_workers=0 the set is decoded on this thread instead.
+        3. The decoded color frame, with the depth frame (and the point cloud with `pointcloud`)
+           of the same set if use_depth is enabled, is published by _publish().
+
+        Stops on DeviceNotConnectedError, logs other errors and continues. Timeouts are expected
+        between external triggers in "hardware_trigger" mode and are not reported there.
         """
         if self.stop_event is None:
             raise RuntimeError(f"{self}: stop_event is not initialized before starting read loop.")
 
         while not self.stop_event.is_set():
             try:
-                color_image = self.read(timeout_ms=500)
-
-                with self.frame_lock:
-                    self.latest_frame = color_image
-                self.new_frame_event.set()
+                image_list = self._grab_frames(500)
+                capture_timestamp = self.capture_timestamp
+                if self._frame_queue is None:
+                    self._process_and_publish(image_list, capture_timestamp)
+                elif self._frame_queue.put((image_list, capture_timestamp, time.perf_counter())):
+                    _PIPELINE_DROPPED.inc()
 
             except DeviceNotConnectedError:
                 break
+            except TimeoutError as e:
+                if self.acquisition_mode != "hardware_trigger":
+                    _READ_ERRORS.inc()
+                    logger.warning(f"Error reading frame in background thread for {self}: {e}")
             except Exception as e:
+                _READ_ERRORS.inc()
                 logger.warning(f"Error reading frame in background thread for {self}: {e}")
 
+    def _decode_loop(self, stop_event: Event, frame_queue: LatestQueue) -> None:
+        """Internal loop of a decode worker, decodes and publishes the frame sets of `frame_queue`."""
+        while not stop_event.is_set():
+            item = frame_queue.get(timeout_s=0.1)
+            if item is None:
+                continue
+            image_list, capture_timestamp, queued_time = item
+            _QUEUE_WAIT_MS.observe_since(queued_time)
+            try:
+                self._process_and_publish(image_list, capture_timestamp)
+            except DeviceNotConnectedError:
+                break
+            except Exception as e:
+                _READ_ERRORS.inc()
+                logger.warning(f"Error decoding frame in background thread for {self}: {e}")
+
+    def _process_and_publish(self, image_list: Any, capture_timestamp: float) -> None:
+        t = time.perf_counter()
+        color_image, depth_image, cloud = self._process_set(image_list, pointcloud=self.config.pointcloud)
+        _PROCESS_MS.observe_since(t)
+        self._publish(color_image, depth_image, cloud, capture_timestamp)
+
+    def _publish(
+        self, color_image: NDArray[Any], depth_image: NDArray[Any] | None, cloud: Any, capture_timestamp: float
+    ) -> None:
+        """
+        Stores a decoded frame set in latest_frame / latest_depth / latest_pointcloud (thread-safe)
+        and sets new_frame_event (and new_depth_event, new_pointcloud_event) to notify listeners.
+        A set captured before the one already published, finished late by a slower worker, is dropped.
+        """
+        with self.frame_lock:
+            if self.latest_timestamp is not None and capture_timestamp <= self.latest_timestamp:
+                _PIPELINE_DROPPED.inc()
+                return
+            self.latest_frame = color_image
+            self.latest_depth = depth_image
+            self.latest_pointcloud = cloud
+            self.latest_timestamp = capture_timestamp
+        _CAPTURE_TO_PUBLISH_MS.observe((time.monotonic() - capture_timestamp) * 1e3)
+        self.new_frame_event.set()
+        if depth_image is not None:
+            self.new_depth_event.set()
+        if cloud is not None:
+            self.new_pointcloud_event.set()
+
     def _start_read_thread(self) -> None:
-        """Starts or restarts the background read thread if it's not running."""
+        """Starts or restarts the background read thread and the decode workers if they're not running."""
         if self.thread is not None and self.thread.is_alive():
             self.thread.join(timeout=0.1)
         if self.stop_event is not None:
             self.stop_event.set()
+        if self._frame_queue is not None:
+            self._frame_queue.close()
 
         self.stop_event = Event()
+        self._frame_queue = None
+        self._workers = []
+        if self.decode_workers > 0:
+            self._frame_queue = LatestQueue(self.config.frame_queue_size)
+            for i in range(self.decode_workers):
+                worker = Thread(
+                    target=self._decode_loop, args=(self.stop_event, self._frame_queue), name=f"{self}_decode_{i}"
+                )
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+
         self.thread = Thread(target=self._read_loop, args=(), name=f"{self}_read_loop")
         self.thread.daemon = True
         self.thread.start()
 
     def _stop_read_thread(self) -> None:
-        """Signals the background read thread to stop and waits for it to join."""
+        """Signals the background read thread and the decode workers to stop and waits for them to join."""
         if self.stop_event is not None:
             self.stop_event.set()
+        if self._frame_queue is not None:
+            self._frame_queue.close()
 
-        if self.thread is not None and self.thread.is_alive():
-            self.thread.join(timeout=2.0)
+        for thread in [self.thread] + self._workers:
+            if thread is not None and thread.is_alive():
+                thread.join(timeout=2.0)
 
         self.thread = None
         self.stop_event = None
+        self._frame_queue = None
+        self._workers = []
 
-    # NOTE(Steven): Missing implementation for depth for now
     def async_read(self, timeout_ms: float = 200) -> NDArray[Any]:
         """
         Reads the latest available frame data (color) asynchronously.
@@ -341,6 +1090,9 @@ class PercipioCamera(Camera):
         read thread. It does not block waiting for the camera hardware directly,
         but may wait up to timeout_ms for the background thread to provide a frame.
 
+        The returned array is not copied. It comes from the camera's buffer pool and stays
+        valid, never overwritten, for as long as the caller keeps a reference to it.
+
         Args:
             timeout_ms (float): Maximum time in milliseconds to wait for a frame
                 to become available. Defaults to 200ms (0.2 seconds).
@@ -354,13 +1106,25 @@ class PercipioCamera(Camera):
             TimeoutError: If no frame data becomes available within the specified timeout.
             RuntimeError: If the background thread died unexpectedly or another error occurs.
         """
+        frame, _, _ = self._wait_latest(self.new_frame_event, timeout_ms)
+        return frame
+
+    def _wait_latest(self, event: Event, timeout_ms: float) -> tuple[NDArray[Any], NDArray[Any] | None, Any]:
+        """
+        Waits until `event` signals a frame set newer than the last one returned, and returns its
+        color image, depth image and point cloud, read under a single lock so they always belong
+        to the same set.
+        """
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
 
         if self.thread is None or not self.thread.is_alive():
             self._start_read_thread()
 
-        if not self.new_frame_event.wait(timeout=timeout_ms / 1000.0):
+        wait_start = time.perf_counter()
+        got_frame = event.wait(timeout=timeout_ms / 1000.0)
+        _ASYNC_READ_WAIT_MS.observe_since(wait_start)
+        if not got_frame:
             thread_alive = self.thread is not None and self.thread.is_alive()
             raise TimeoutError(
                 f"Timed out waiting for frame from camera {self} after {timeout_ms} ms. "
@@ -369,12 +1133,86 @@ class PercipioCamera(Camera):
 
         with self.frame_lock:
             frame = self.latest_frame
-            self.new_frame_event.clear()
+            depth = self.latest_depth
+            cloud = self.latest_pointcloud
+            self.frame_timestamp = self.latest_timestamp
+            event.clear()
 
         if frame is None:
             raise RuntimeError(f"Internal error: Event set but no frame available for {self}.")
 
-        return frame
+        return frame, depth, cloud
+
+    def async_read_rgbd(self, timeout_ms: float = 200) -> tuple[NDArray[Any], NDArray[Any]]:
+        """
+        Reads the latest color and depth pair captured by the background read thread.
+
+        Both images come from the same frame set, their shared capture time is stored in
+        `frame_timestamp`. Waits like `async_read()`, at most `timeout_ms` for a new frame set.
+
+        Returns:
+            tuple: The latest processed color image and depth image.
+
+        Raises:
+            DeviceNotConnectedError: If the camera is not connected.
+            RuntimeError: If depth is not enabled.
+            TimeoutError: If no frame data becomes available within the specified timeout.
+        """
+        if not self.use_depth:
+            raise RuntimeError(
+                f"Failed to read depth frame '.async_read_rgbd()'. Depth stream is not enabled for {self}."
+            )
+        frame, depth, _ = self._wait_latest(self.new_frame_event, timeout_ms)
+        if depth is None:
+            raise RuntimeError(f"Internal error: Color frame available but no depth frame for {self}.")
+        self.new_depth_event.clear()
+
+        return frame, depth
+
+    def async_read_depth(self, timeout_ms: float = 200) -> NDArray[Any]:
+        """
+        Reads the latest depth frame captured by the background read thread.
+
+        The counterpart of `async_read()` for depth, with its own new-frame event. The capture
+        time is stored in `frame_timestamp`.
+
+        Raises:
+            DeviceNotConnectedError: If the camera is not connected.
+            RuntimeError: If depth is not enabled.
+            TimeoutError: If no depth frame becomes available within the specified timeout.
+        """
+        if not self.use_depth:
+            raise RuntimeError(
+                f"Failed to read depth frame '.async_read_depth()'. Depth stream is not enabled for {self}."
+            )
+        _, depth, _ = self._wait_latest(self.new_depth_event, timeout_ms)
+        if depth is None:
+            raise RuntimeError(f"Internal error: Event set but no depth frame available for {self}.")
+
+        return depth
+
+    def async_read_pointcloud(
+        self, timeout_ms: float = 200
+    ) -> tuple[NDArray[np.float32], NDArray[np.uint8] | None]:
+        """
+        Reads the latest point cloud computed by the background read thread, see
+        `read_pointcloud()`. Requires the `pointcloud` option. The capture time is stored in
+        `frame_timestamp`.
+
+        Raises:
+            DeviceNotConnectedError: If the camera is not connected.
+            RuntimeError: If point clouds are not enabled.
+            TimeoutError: If no point cloud becomes available within the specified timeout.
+        """
+        if not self.config.pointcloud:
+            raise RuntimeError(
+                f"Failed to read point cloud '.async_read_pointcloud()'. Point clouds are not enabled for {self}."
+            )
+        _, _, cloud = self._wait_latest(self.new_pointcloud_event, timeout_ms)
+        if cloud is None:
+            raise RuntimeError(f"Internal error: Event set but no point cloud available for {self}.")
+
+        return cloud
 
     def disconnect(self) -> None:
         """
@@ -395,7 +1233,9 @@ class PercipioCamera(Camera):
             self._stop_read_thread()
 
      
-        self.cl.DeviceStreamOff(self.handle)    
-        self.cl.Close(self.handle)
+        self.cl.DeviceStreamOff(self.handle)
+        with SDK_LOCK:
+            self.cl.Close(self.handle)
+        self.handle = None
 
         logger.info(f"{self} disconnected.")
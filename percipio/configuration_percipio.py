@@ -1,27 +1,122 @@
 from dataclasses import dataclass
 from lerobot.cameras.configs import CameraConfig, ColorMode, Cv2Rotation
 
+from percipio.depth_filters import DEPTH_FILTERS
+from percipio.formats import COLOR_PIXEL_FORMATS
+
+OUTPUT_FORMATS = ("hwc", "chw", "chw_float16")
+
+ACQUISITION_MODES = ("continuous", "software_trigger", "hardware_trigger")
+
+
 @CameraConfig.register_subclass("Percipio")
 @dataclass
 class PercipioCameraConfig(CameraConfig):
     """Configuration class for Percipio-based camera devices.
 
     Attributes:
+        serial_number_or_ip: Serial number or IP address of the camera to open. May be left unset
+            when only one Percipio camera is attached.
         color_mode: Color mode for image output (RGB or BGR). Defaults to RGB.
-        use_depth: Whether to enable depth stream. Defaults to False.
+        use_depth: Whether to enable depth stream. Defaults to False. Depth is returned as uint16
+            millimeters (scaled by the calibrated depth unit), shape (h, w, 1).
         rotation: Image rotation setting (0°, 90°, 180°, or 270°). Defaults to no rotation.
         warmup_s: Time reading frames before returning from connect (in seconds)
+        acquisition_mode: How frames are acquired. "software_trigger" (default) triggers one
+            capture per read. "continuous" lets the device stream at its native fps and reads
+            consume frames as they arrive. "hardware_trigger" waits for frames triggered by the
+            external trigger input.
+        registration_mode: Whether to align depth and color. Requires use_depth.
+        registration_target: Frame the images are aligned to. "color" (default) maps depth into the
+            color image, "depth" maps color into the depth image.
+        registration_backend: "sdk" (default) aligns with the Percipio SDK, "numpy" with tables
+            precomputed from the calibration (see percipio.registration), no SDK call per frame.
+        pointcloud: Whether the background read thread also computes the point cloud of every
+            frame set, for async_read_pointcloud(). Requires use_depth.
+        pointcloud_backend: "numpy" (default) projects depth with a precomputed ray table,
+            "sdk" uses DeviceStreamMapDepthImageToPoint3D.
+        pointcloud_stride: Keep every n-th depth pixel in both directions.
+        pointcloud_voxel_size: Optional voxel edge in meters, keeps one point per voxel.
+        pointcloud_box: Optional workspace box [xmin, ymin, zmin, xmax, ymax, zmax] in meters in
+            the camera frame, points outside are dropped.
+        pointcloud_colors: Whether to return the color of every point. Requires registration_mode.
+        undistort: Whether to remove lens distortion from color frames (and depth registered to
+            them) with remap tables built at connect from the calibration, see
+            percipio.undistortion. Not supported with registration_target="depth".
+        cache_dir: Directory where stream formats, calibration and tables derived from them are
+            persisted per camera serial number and firmware version, so reconnects skip the SDK
+            queries (see percipio.device_cache). None disables persisting. Defaults to
+            ~/.cache/percipio.
+        buffer_pool_size: Number of preallocated output arrays per stream that frames are
+            recycled through (see percipio.buffer_pool).
+        crop: Optional region [top, left, height, width] of the (unrotated) frame kept, as
+            fractions of its height and width, so it holds for any stream format. Applies to color
+            and, with registration_mode, to the registered depth. The crop is resized to the
+            capture size, and the stream format is negotiated for the full frame that covers it.
+        output_format: Layout of the color images returned. "hwc" (default) is (h, w, 3) uint8,
+            "chw" (3, h, w) uint8 and "chw_float16" (3, h, w) float16 scaled to [0, 1], ready for
+            a policy. Depth images stay (h, w, c).
+        decode_workers: Number of threads decoding and postprocessing the frame sets acquired by
+            the background read thread (async_read*), which meanwhile acquires the next set. 0
+            acquires and decodes on the background thread alone, one set after the other.
+        frame_queue_size: Number of acquired frame sets waiting for a decode worker. When the
+            workers fall behind, the oldest waiting set is dropped (percipio.pipeline_dropped).
+        depth_render: Debug option returning depth as the SDK colormap rendering, (h, w, 3) uint8,
+            instead of millimeters. Not supported with registration_mode.
+        depth_filters: Filters run in this order on every raw depth frame before it is rendered,
+            registered or projected, names from DEPTH_FILTERS: "speckle" (SDK speckle filter),
+            "temporal" (moving average over frames) and "hole_fill" (see percipio.depth_filters).
+            Requires use_depth.
+        speckle_max_size: Largest blob (pixels) removed by the speckle filter.
+        speckle_max_diff: Depth difference (raw units) separating a blob from its surroundings.
+        temporal_alpha: Weight of the new frame in the temporal average, in (0, 1].
+        temporal_delta_mm: Depth change (mm) above which a pixel restarts from the new frame
+            instead of being averaged.
+        hole_fill_radius: Largest hole radius (pixels) filled by the hole fill.
+        color_pixel_format: Pixel format the color stream is configured with, one of
+            COLOR_PIXEL_FORMATS. None (default) picks the cheapest to decode among the formats of
+            the selected resolution.
 
     Note:
-
+        `width` and `height` are the size of the returned images (after rotation). At connect,
+        the color and depth streams are configured with the device format closest to that size
+        (see percipio.formats), frames are only resized on the host when the device has no
+        format of exactly that size. Unset, they default to the largest color format. `fps` is
+        not part of Percipio stream formats and is not configured, in "continuous" mode the
+        device streams at its native rate.
     """
 
+    serial_number_or_ip: str | None = None
     use_depth: bool = False
     registration_mode: bool = False
     color_mode: ColorMode = ColorMode.RGB
     rotation: Cv2Rotation = Cv2Rotation.NO_ROTATION
     warmup_s: int = 1
     fourcc: str | None = None
+    acquisition_mode: str = "software_trigger"
+    registration_target: str = "color"
+    registration_backend: str = "sdk"
+    pointcloud: bool = False
+    pointcloud_backend: str = "numpy"
+    pointcloud_stride: int = 1
+    pointcloud_voxel_size: float | None = None
+    pointcloud_box: list[float] | None = None
+    pointcloud_colors: bool = False
+    undistort: bool = False
+    cache_dir: str | None = "~/.cache/percipio"
+    buffer_pool_size: int = 4
+    color_pixel_format: str | None = None
+    depth_render: bool = False
+    depth_filters: list[str] | None = None
+    speckle_max_size: int = 150
+    speckle_max_diff: int = 64
+    temporal_alpha: float = 0.4
+    temporal_delta_mm: float = 20.0
+    hole_fill_radius: int = 2
+    crop: list[float] | None = None
+    output_format: str = "hwc"
+    decode_workers: int = 1
+    frame_queue_size: int = 1
 
     def __post_init__(self) -> None:
         if self.color_mode not in (ColorMode.RGB, ColorMode.BGR):
@@ -39,6 +134,106 @@ class PercipioCameraConfig(CameraConfig):
                 f"`rotation` is expected to be in {(Cv2Rotation.NO_ROTATION, Cv2Rotation.ROTATE_90, Cv2Rotation.ROTATE_180, Cv2Rotation.ROTATE_270)}, but {self.rotation} is provided."
             )
 
+        if self.acquisition_mode not in ACQUISITION_MODES:
+            raise ValueError(
+                f"`acquisition_mode` is expected to be in {ACQUISITION_MODES}, but {self.acquisition_mode} is provided."
+            )
+
+        if self.registration_target not in ("color", "depth"):
+            raise ValueError(
+                f"`registration_target` is expected to be 'color' or 'depth', but {self.registration_target} is provided."
+            )
+
+        if self.registration_backend not in ("sdk", "numpy"):
+            raise ValueError(
+                f"`registration_backend` is expected to be 'sdk' or 'numpy', but {self.registration_backend} is provided."
+            )
+
+        if self.registration_mode and not self.use_depth:
+            raise ValueError("`registration_mode` requires `use_depth`.")
+
+        if self.pointcloud and not self.use_depth:
+            raise ValueError("`pointcloud` requires `use_depth`.")
+
+        if self.pointcloud_backend not in ("numpy", "sdk"):
+            raise ValueError(
+                f"`pointcloud_backend` is expected to be 'numpy' or 'sdk', but {self.pointcloud_backend} is provided."
+            )
+
+        if self.pointcloud_stride < 1:
+            raise ValueError(f"`pointcloud_stride` must be at least 1, but {self.pointcloud_stride} is provided.")
+
+        if self.pointcloud_voxel_size is not None and self.pointcloud_voxel_size <= 0:
+            raise ValueError(f"`pointcloud_voxel_size` must be positive, but {self.pointcloud_voxel_size} is provided.")
+
+        if self.pointcloud_box is not None and len(self.pointcloud_box) != 6:
+            raise ValueError(
+                f"`pointcloud_box` must be [xmin, ymin, zmin, xmax, ymax, zmax], but {self.pointcloud_box} is provided."
+            )
+
+        if self.pointcloud_colors and not self.registration_mode:
+            raise ValueError("`pointcloud_colors` requires `registration_mode`.")
+
+        if self.undistort and self.registration_mode and self.registration_target == "depth":
+            raise ValueError("`undistort` is not supported with `registration_target` 'depth'.")
+
+        if self.buffer_pool_size < 2:
+            raise ValueError(f"`buffer_pool_size` must be at least 2, but {self.buffer_pool_size} is provided.")
+
+        if self.crop is not None:
+            if len(self.crop) != 4:
+                raise ValueError(f"`crop` must be [top, left, height, width], but {self.crop} is provided.")
+            top, left, height, width = self.crop
+            if not (0 <= top < 1 and 0 <= left < 1 and 0 < height <= 1 - top and 0 < width <= 1 - left):
+                raise ValueError(
+                    f"`crop` must be [top, left, height, width] fractions of the frame within it, but {self.crop} is provided."
+                )
+
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"`output_format` is expected to be in {OUTPUT_FORMATS}, but {self.output_format} is provided."
+            )
+
+        if self.decode_workers < 0:
+            raise ValueError(f"`decode_workers` must be at least 0, but {self.decode_workers} is provided.")
+
+        if self.frame_queue_size < 1:
+            raise ValueError(f"`frame_queue_size` must be at least 1, but {self.frame_queue_size} is provided.")
+
+        if self.depth_render and self.registration_mode:
+            raise ValueError("`depth_render` is not supported with `registration_mode`.")
+
+        if self.depth_filters:
+            if not self.use_depth:
+                raise ValueError("`depth_filters` requires `use_depth`.")
+            unknown = [name for name in self.depth_filters if name not in DEPTH_FILTERS]
+            if unknown or len(set(self.depth_filters)) != len(self.depth_filters):
+                raise ValueError(
+                    f"`depth_filters` is expected to list distinct filters of {DEPTH_FILTERS}, but {self.depth_filters} is provided."
+                )
+
+        if self.speckle_max_size < 1 or self.speckle_max_diff < 1:
+            raise ValueError(
+                f"`speckle_max_size` and `speckle_max_diff` must be positive, but {self.speckle_max_size} and {self.speckle_max_diff} are provided."
+            )
+
+        if not 0 < self.temporal_alpha <= 1:
+            raise ValueError(f"`temporal_alpha` must be in (0, 1], but {self.temporal_alpha} is provided.")
+
+        if self.temporal_delta_mm <= 0:
+            raise ValueError(f"`temporal_delta_mm` must be positive, but {self.temporal_delta_mm} is provided.")
+
+        if self.hole_fill_radius < 1:
+            raise ValueError(f"`hole_fill_radius` must be at least 1, but {self.hole_fill_radius} is provided.")
+
+        if self.color_pixel_format is not None and self.color_pixel_format not in COLOR_PIXEL_FORMATS:
+            raise ValueError(
+                f"`color_pixel_format` is expected to be in {COLOR_PIXEL_FORMATS}, but {self.color_pixel_format} is provided."
+            )
+
+        if (self.width is None) != (self.height is None):
+            raise ValueError("For `width` and `height`, either both need to be set, or none of them.")
+
         values = (self.use_depth, self.registration_mode)
         if any(v is not None for v in values) and any(v is None for v in values):
             raise ValueError(
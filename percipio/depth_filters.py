@@ -0,0 +1,170 @@
+"""
+Depth filter chain for Percipio cameras.
+
+`DepthFilterChain` runs an ordered list of filters on every raw uint16 depth frame, in place on
+the SDK frame buffer, before it is rendered, registered or projected, so every depth output of the
+camera is filtered once:
+
+- "speckle": the SDK speckle filter (`DeviceStreamDepthSpeckleFilter`), removes small blobs whose
+  depth differs from their surroundings.
+- "temporal": exponential moving average over frames, with its state in preallocated buffers.
+  Pixels that changed by more than a threshold (motion, edges) restart from the new depth instead
+  of smearing. A frame older than the state (finished out of order by another decode worker) is
+  blended against the state too, but does not update it.
+- "hole_fill": fills missing depth (0) from the farthest valid 4-neighbour, repeated `radius`
+  times. Preferring the background keeps foreground objects from growing into the occlusion
+  shadows along their edges. Valid pixels are never changed.
+
+Each stage is timed in `percipio.depth_filter_<name>_ms`.
+"""
+
+import threading
+import time
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from zprobot_metrics import REGISTRY
+
+DEPTH_FILTERS = ("speckle", "temporal", "hole_fill")
+
+
+class SpeckleFilter:
+    """The SDK speckle filter, see `DeviceStreamDepthSpeckleFilter`."""
+
+    def __init__(self, cl: Any, max_size: int = 150, max_diff: int = 64):
+        self.cl = cl
+        self.max_size = max_size
+        self.max_diff = max_diff
+
+    def __call__(self, depth_image: Any, depth: NDArray[np.uint16], timestamp: int | None = None) -> None:
+        #该接口用于对 Depth 图做去斑点滤波（原地修改）
+        err = self.cl.DeviceStreamDepthSpeckleFilter(self.max_size, self.max_diff, depth_image)
+        if err:
+            raise RuntimeError(f"Depth speckle filter failed: {self.cl.TYGetLastErrorCodedescription()}")
+
+
+class TemporalFilter:
+    """
+    Exponential moving average of depth over frames.
+
+    Args:
+        alpha: Weight of the new frame, 1 disables smoothing.
+        delta: Largest change (raw depth units) still averaged, larger changes reset the pixel.
+    """
+
+    def __init__(self, alpha: float = 0.4, delta: float = 20.0):
+        self.alpha = alpha
+        self.delta = delta
+        self._lock = threading.Lock()
+        self._state: NDArray[np.float32] | None = None
+        self._last_timestamp: int | None = None
+        # scratch buffers, allocated with the state
+        self._diff: NDArray[np.float32] | None = None
+        self._abs: NDArray[np.float32] | None = None
+        self._blend: NDArray[np.float32] | None = None
+        self._mask: NDArray[np.bool_] | None = None
+        self._tmp: NDArray[np.bool_] | None = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = None
+            self._last_timestamp = None
+
+    def __call__(self, depth_image: Any, depth: NDArray[np.uint16], timestamp: int | None = None) -> None:
+        d = depth.reshape(depth.shape[0], depth.shape[1])
+        with self._lock:
+            if self._state is None or self._state.shape != d.shape:
+                self._state = d.astype(np.float32)
+                self._diff = np.empty(d.shape, np.float32)
+                self._abs = np.empty(d.shape, np.float32)
+                self._blend = np.empty(d.shape, np.float32)
+                self._mask = np.empty(d.shape, bool)
+                self._tmp = np.empty(d.shape, bool)
+                self._last_timestamp = timestamp
+                return
+            state, diff, mask, tmp = self._state, self._diff, self._mask, self._tmp
+
+            # decode workers may finish frames out of order: an older frame is still smoothed,
+            # but the state only moves forward in time
+            in_order = timestamp is None or self._last_timestamp is None or timestamp > self._last_timestamp
+            if in_order:
+                self._last_timestamp = timestamp
+            out = state if in_order else self._blend
+
+            # averaged: d - (1 - alpha) * (d - state) where both are valid and close, else d
+            np.subtract(d, state, out=diff, dtype=np.float32)
+            np.abs(diff, out=self._abs)
+            np.less_equal(self._abs, self.delta, out=mask)
+            np.greater(state, 0, out=tmp)
+            mask &= tmp
+            np.greater(d, 0, out=tmp)
+            mask &= tmp
+            diff *= 1.0 - self.alpha
+            diff *= mask
+            np.subtract(d, diff, out=out, dtype=np.float32)
+            np.add(out, 0.5, out=d, casting="unsafe")
+
+
+class HoleFillFilter:
+    """
+    Fills missing depth from the farthest valid 4-neighbour.
+
+    Args:
+        radius: Number of passes, i.e. the largest hole radius (pixels) filled.
+    """
+
+    def __init__(self, radius: int = 2):
+        self.radius = radius
+        self._neighbours: NDArray[np.uint16] | None = None
+        self._holes: NDArray[np.bool_] | None = None
+
+    def __call__(self, depth_image: Any, depth: NDArray[np.uint16], timestamp: int | None = None) -> None:
+        d = depth.reshape(depth.shape[0], depth.shape[1])
+        if self._neighbours is None or self._neighbours.shape != d.shape or self._neighbours.dtype != d.dtype:
+            self._neighbours = np.empty_like(d)
+            self._holes = np.empty(d.shape, bool)
+        nb, holes = self._neighbours, self._holes
+
+        for _ in range(self.radius):
+            np.equal(d, 0, out=holes)
+            if not holes.any():
+                break
+            nb.fill(0)
+            np.maximum(nb[1:], d[:-1], out=nb[1:])
+            np.maximum(nb[:-1], d[1:], out=nb[:-1])
+            np.maximum(nb[:, 1:], d[:, :-1], out=nb[:, 1:])
+            np.maximum(nb[:, :-1], d[:, 1:], out=nb[:, :-1])
+            np.copyto(d, nb, where=holes)
+
+
+class DepthFilterChain:
+    """
+    Runs depth filters in order, in place.
+
+    Not thread-safe: the stages keep scratch buffers. Only `TemporalFilter` serializes itself, so
+    decoding threads each build their own chain around one shared temporal filter.
+
+    Args:
+        filters: (name, stage) pairs, names from `DEPTH_FILTERS`, in the order the stages run.
+    """
+
+    def __init__(self, filters: list[tuple[str, Any]]):
+        self.filters = filters
+        self._timers = [REGISTRY.histogram(f"percipio.depth_filter_{name}_ms") for name, _ in filters]
+
+    def __call__(self, depth_image: Any, depth: NDArray[np.uint16], timestamp: int | None = None) -> None:
+        """
+        Filters a raw depth frame.
+
+        Args:
+            depth_image: The SDK image_data of the frame, filtered in place by the SDK stages.
+            depth: Its memory as a (h, w) or (h, w, 1) uint16 array, filtered in place by the numpy
+                stages.
+            timestamp: Device timestamp of the frame, orders the frames for the temporal filter.
+        """
+        for (_, stage), timer in zip(self.filters, self._timers):
+            t = time.perf_counter()
+            stage(depth_image, depth, timestamp)
+            timer.observe_since(t)
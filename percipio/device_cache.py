@@ -0,0 +1,121 @@
+"""
+Persistent cache of what `PercipioCamera.connect()` reads from a camera.
+
+Querying stream formats and calibration over the SDK, and deriving remap/ray tables from them, is
+the slow part of bringing a camera up. `DeviceCache` keeps the results per camera on disk, keyed by
+serial number and firmware version, so reconnects after a fault and process restarts reuse them:
+
+    <cache_dir>/<serial>_<firmware>/info.json   small values (formats, calibration, depth scale)
+    <cache_dir>/<serial>_<firmware>/<name>.npz  tables derived from them
+
+A firmware update changes the key and therefore starts a new cache. After recalibrating a camera,
+delete its directory (or call `clear()`) so the new calibration is read.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+
+def table_name(prefix: str, *params: Any) -> str:
+    """Returns the cache name of a table derived from `params` (sizes, rotation, ...)."""
+    digest = hashlib.sha1(repr([np.asarray(p).tolist() for p in params]).encode()).hexdigest()[:16]
+    return f"{prefix}_{digest}"
+
+
+class DeviceCache:
+    """
+    Cache of one camera, in memory and, unless `cache_dir` is None, on disk.
+
+    Disk errors are logged and otherwise ignored, the cache only saves time. Thread-safe.
+
+    Args:
+        cache_dir: Root directory of the caches, None keeps the values in memory only.
+        serial_number: Serial number of the camera.
+        firmware_version: Firmware version of the camera.
+    """
+
+    def __init__(self, cache_dir: str | None, serial_number: str, firmware_version: str):
+        self.dir: str | None = None
+        if cache_dir is not None:
+            key = re.sub(r"[^\w.-]", "_", f"{serial_number}_{firmware_version}")
+            self.dir = os.path.join(os.path.expanduser(cache_dir), key)
+        self._lock = threading.Lock()
+        self._values: dict[str, Any] = self._read_info()
+
+    def _read_info(self) -> dict[str, Any]:
+        if self.dir is None:
+            return {}
+        path = os.path.join(self.dir, "info.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable device cache {path}: {e}")
+            return {}
+
+    def get(self, key: str) -> Any:
+        """Returns the cached value of `key`, or None."""
+        with self._lock:
+            return self._values.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """Caches a JSON serializable value (numpy arrays are stored as lists)."""
+        value = json.loads(json.dumps(value, default=lambda o: np.asarray(o).tolist()))
+        with self._lock:
+            self._values[key] = value
+            self._write(
+                "info.json", lambda f: f.write(json.dumps(self._values, indent=1, sort_keys=True).encode())
+            )
+
+    def load_arrays(self, name: str) -> dict[str, NDArray[Any]] | None:
+        """Returns the arrays saved under `name`, or None."""
+        if self.dir is None:
+            return None
+        path = os.path.join(self.dir, f"{name}.npz")
+        try:
+            with np.load(path) as data:
+                return {k: data[k] for k in data.files}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached table {path}: {e}")
+            return None
+
+    def save_arrays(self, name: str, **arrays: NDArray[Any]) -> None:
+        """Saves arrays under `name`."""
+        with self._lock:
+            self._write(f"{name}.npz", lambda f: np.savez(f, **arrays))
+
+    def clear(self) -> None:
+        """Drops every cached value and table of this camera."""
+        with self._lock:
+            self._values = {}
+            if self.dir is not None:
+                shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _write(self, filename: str, write: Any) -> None:
+        """Writes a file atomically, readers never see a partial file."""
+        if self.dir is None:
+            return
+        path = os.path.join(self.dir, filename)
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write device cache {path}: {e}")
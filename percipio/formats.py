@@ -0,0 +1,87 @@
+"""
+Stream format negotiation for Percipio cameras.
+
+`DeviceStreamFormatDump` lists the image modes (pixel format + resolution) a stream supports.
+`select_format()` picks the mode that delivers the requested resolution with the least work:
+
+1. a mode of exactly the requested size, so frames need no resize at all,
+2. else the smallest mode covering the requested size, which moves the fewest bytes and is
+   downscaled (never upscaled) on the host,
+3. else the largest mode.
+
+Among modes of the same size, the pixel format cheapest to decode wins (`PIXEL_FORMAT_COST`).
+Frame rates are not part of Percipio image modes and play no role here.
+"""
+
+from typing import Any
+
+# Color pixel formats that can be forced with `PercipioCameraConfig.color_pixel_format`, by the
+# suffix of their TY_PIXEL_FORMAT_* constant.
+COLOR_PIXEL_FORMATS = ("rgb", "bgr", "yuyv", "yvyu", "mjpg", "jpeg")
+
+# Relative host cost of decoding a pixel format to RGB: raw RGB/BGR is a copy, packed YUV a
+# per-pixel conversion, JPEG a full decompression. Formats not listed (bayer, mono, ...) rank
+# between YUV and JPEG.
+PIXEL_FORMAT_COST = {"rgb": 0, "bgr": 0, "yuyv": 1, "yvyu": 1, "mjpg": 3, "jpeg": 3}
+_DEFAULT_COST = 2
+
+
+def pixel_format_value(sdk: Any, name: str) -> int:
+    """Returns the TY_PIXEL_FORMAT_* constant of a pixel format name such as "yuyv"."""
+    return getattr(sdk, f"TY_PIXEL_FORMAT_{name.upper()}")
+
+
+def select_format(
+    sdk: Any,
+    cl: Any,
+    formats: Any,
+    size: tuple[int, int] | None = None,
+    pixel_format: str | None = None,
+) -> Any:
+    """
+    Selects the stream format to configure.
+
+    Args:
+        sdk: The pcammls module.
+        cl: The PercipioSDK instance.
+        formats: Formats of one stream, from `DeviceStreamFormatDump`.
+        size: Requested resolution (w, h), None for the largest one.
+        pixel_format: Only consider this pixel format (see `COLOR_PIXEL_FORMATS`).
+
+    Returns:
+        The selected entry of `formats`.
+
+    Raises:
+        ValueError: If no format (of `pixel_format`) is available.
+    """
+    costs = {
+        pixel_format_value(sdk, name): cost
+        for name, cost in PIXEL_FORMAT_COST.items()
+        if hasattr(sdk, f"TY_PIXEL_FORMAT_{name.upper()}")
+    }
+    wanted = None if pixel_format is None else pixel_format_value(sdk, pixel_format)
+
+    best, best_key = None, None
+    for idx in range(len(formats)):
+        fmt = formats[idx]
+        pf = sdk.TYPixelFormat(fmt.getValue())
+        if wanted is not None and pf != wanted:
+            continue
+        w, h = cl.Width(fmt), cl.Height(fmt)
+        area = w * h
+        if size is None:
+            rank = (0, -area)
+        elif (w, h) == tuple(size):
+            rank = (0, 0)
+        elif w >= size[0] and h >= size[1]:
+            rank = (1, area)
+        else:
+            rank = (2, -area)
+        key = rank + (costs.get(pf, _DEFAULT_COST), idx)
+        if best_key is None or key < best_key:
+            best, best_key = fmt, key
+
+    if best is None:
+        suffix = "" if pixel_format is None else f" with pixel format {pixel_format}"
+        raise ValueError(f"No stream format{suffix} among {len(formats)} available formats.")
+    return best
@@ -0,0 +1,56 @@
+"""
+Building blocks of the staged Percipio read pipeline.
+
+The background read of a `PercipioCamera` runs as stages on their own threads: acquisition
+(trigger + `DeviceStreamRead`) feeds a pool of decode/postprocess workers through a
+`LatestQueue`. The SDK decode and OpenCV release the GIL, so while frame set N is decoded frame
+set N + 1 is already acquired. Stages never block each other: when the consumer falls behind, the
+oldest pending item is dropped, a control loop wants the newest frame rather than every frame.
+"""
+
+import time
+from collections import deque
+from threading import Condition
+from typing import Any
+
+
+class LatestQueue:
+    """
+    Bounded queue between two pipeline stages that drops the oldest item when full (latest wins).
+
+    Args:
+        maxsize: Number of pending items kept.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        if maxsize < 1:
+            raise ValueError(f"LatestQueue maxsize must be at least 1, but {maxsize} is provided.")
+        self._items: deque = deque(maxlen=maxsize)
+        self._cond = Condition()
+        self._closed = False
+
+    def put(self, item: Any) -> bool:
+        """Enqueues `item`, returns whether an older pending item was dropped for it."""
+        with self._cond:
+            dropped = len(self._items) == self._items.maxlen
+            self._items.append(item)
+            self._cond.notify()
+        return dropped
+
+    def get(self, timeout_s: float) -> Any:
+        """Returns the oldest pending item, or None after `timeout_s` or once closed."""
+        deadline = time.monotonic() + timeout_s
+        with self._cond:
+            while not self._items:
+                remaining_s = deadline - time.monotonic()
+                if self._closed or remaining_s <= 0:
+                    return None
+                self._cond.wait(remaining_s)
+            return self._items.popleft()
+
+    def close(self) -> None:
+        """Drops the pending items and wakes up all waiting consumers."""
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
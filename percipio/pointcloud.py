@@ -0,0 +1,135 @@
+"""
+Point clouds from Percipio depth images.
+
+`PointCloudProjector` precomputes the viewing ray of every (strided) pixel from the intrinsics, so
+projecting a depth image is a single multiply. The same post-processing (invalid points, workspace
+box, voxel downsampling) is applied to clouds computed by the SDK
+(`DeviceStreamMapDepthImageToPoint3D`), passed in through `from_points()`.
+
+Points are float32 (N, 3) in meters in the camera frame, colors uint8 (N, 3).
+"""
+
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from percipio.buffer_pool import BufferPool
+
+
+class PointCloudProjector:
+    """
+    Projects depth images of one resolution to point clouds.
+
+    Args:
+        intrinsic: (3, 3) intrinsic matrix of the depth image, at its resolution.
+        size: Depth image resolution (w, h).
+        stride: Keep every `stride`-th pixel in both directions.
+        box: Optional workspace box (xmin, ymin, zmin, xmax, ymax, zmax) in meters, camera frame.
+            Points outside are dropped.
+        voxel_size: Optional voxel edge (m), keeps one point per occupied voxel.
+        pool_size: Number of recycled output arrays, see `BufferPool` for the ownership rules.
+    """
+
+    def __init__(
+        self,
+        intrinsic: NDArray[Any],
+        size: tuple[int, int],
+        stride: int = 1,
+        box: Any = None,
+        voxel_size: float | None = None,
+        pool_size: int = 4,
+    ):
+        self.size = size
+        self.stride = stride
+        self.box = None if box is None else np.asarray(box, dtype=np.float32).reshape(2, 3)
+        self.voxel_size = voxel_size
+
+        w, h = size
+        fx, fy, cx, cy = intrinsic[0, 0], intrinsic[1, 1], intrinsic[0, 2], intrinsic[1, 2]
+        u = (np.arange(0, w, stride, dtype=np.float64) - cx) / fx
+        v = (np.arange(0, h, stride, dtype=np.float64) - cy) / fy
+        # (x/z, y/z, 1) of every kept pixel, row-major like the strided image
+        self._rays = np.empty((len(v), len(u), 3), dtype=np.float32)
+        self._rays[..., 0] = u[None, :]
+        self._rays[..., 1] = v[:, None]
+        self._rays[..., 2] = 1.0
+        self._rays = self._rays.reshape(-1, 3)
+
+        n = len(self._rays)
+        # strided images are copied into these, shape (h // stride, w // stride, ...)
+        self._grid_shape = (len(v), len(u))
+        self._points = np.empty((n, 3), dtype=np.float32)
+        self._z = np.empty((n, 1), dtype=np.float32)
+        self._colors: NDArray[Any] | None = None
+        self._valid = np.empty(n, dtype=bool)
+        self._tmp = np.empty(n, dtype=bool)
+        self._point_pool = BufferPool(pool_size)
+        self._color_pool = BufferPool(pool_size)
+
+    def from_depth(
+        self, depth_mm: NDArray[Any], colors: NDArray[Any] | None = None
+    ) -> tuple[NDArray[np.float32], NDArray[np.uint8] | None]:
+        """
+        Projects a depth image in millimeters, shape (h, w) or (h, w, 1).
+
+        Args:
+            colors: Optional (h, w, 3) image aligned with the depth image.
+
+        Returns:
+            The points and, if `colors` is given, their colors.
+        """
+        s = self.stride
+        z = depth_mm.reshape(depth_mm.shape[0], depth_mm.shape[1])[::s, ::s]
+        # written through a grid view of the buffer, reshaping the strided view would copy it
+        np.multiply(z, np.float32(0.001), out=self._z.reshape(self._grid_shape), casting="unsafe")
+        np.multiply(self._rays, self._z, out=self._points)
+        return self._finish(colors)
+
+    def from_points(
+        self, points_mm: NDArray[Any], colors: NDArray[Any] | None = None
+    ) -> tuple[NDArray[np.float32], NDArray[np.uint8] | None]:
+        """Same as `from_depth()` for an (h, w, 3) cloud in millimeters computed by the SDK."""
+        s = self.stride
+        np.multiply(points_mm[::s, ::s], np.float32(0.001), out=self._points.reshape(self._grid_shape + (3,)))
+        return self._finish(colors)
+
+    def _finish(self, colors: NDArray[Any] | None) -> tuple[NDArray[np.float32], NDArray[np.uint8] | None]:
+        points, valid, tmp = self._points, self._valid, self._tmp
+
+        # missing depth is 0 (or NaN from the SDK), which fails the comparison
+        np.greater(points[:, 2], 0, out=valid)
+        if self.box is not None:
+            for axis in range(3):
+                np.greater_equal(points[:, axis], self.box[0, axis], out=tmp)
+                valid &= tmp
+                np.less_equal(points[:, axis], self.box[1, axis], out=tmp)
+                valid &= tmp
+        idx = np.flatnonzero(valid)
+
+        if self.voxel_size is not None and len(idx):
+            keys = np.floor(points[idx] / self.voxel_size).astype(np.int64)
+            keys -= keys.min(axis=0)
+            span = keys.max(axis=0) + 1
+            flat_keys = (keys[:, 0] * span[1] + keys[:, 1]) * span[2] + keys[:, 2]
+            _, first = np.unique(flat_keys, return_index=True)
+            idx = idx[np.sort(first)]
+
+        n = len(idx)
+        out_points = self._point_pool.acquire(self._points.shape, np.float32)[:n]
+        np.take(points, idx, axis=0, out=out_points)
+
+        out_colors = None
+        if colors is not None:
+            s = self.stride
+            if s == 1:
+                flat_colors = colors.reshape(-1, colors.shape[-1])
+            else:
+                shape = self._grid_shape + colors.shape[2:]
+                if self._colors is None or self._colors.shape != shape or self._colors.dtype != colors.dtype:
+                    self._colors = np.empty(shape, dtype=colors.dtype)
+                np.copyto(self._colors, colors[::s, ::s])
+                flat_colors = self._colors.reshape(-1, colors.shape[-1])
+            out_colors = self._color_pool.acquire(self._points.shape, np.uint8)[:n]
+            np.take(flat_colors, idx, axis=0, out=out_colors)
+        return out_points, out_colors
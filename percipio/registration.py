@@ -0,0 +1,216 @@
+"""
+Depth / color registration for Percipio cameras.
+
+`calib_to_numpy()` converts the SDK calibration once. `DepthRegistration` then aligns frames with
+pure numpy: the ray of every depth pixel is projected into the color camera once at construction,
+so registering a frame is a multiply-add per pixel plus one scatter (depth to color) or gather
+(color to depth). It does not touch the SDK and can run in any thread.
+
+Lens distortion is ignored, like the intrinsics of undistorted images.
+"""
+
+from typing import Any
+
+import cv2  # type: ignore  # TODO: add type stubs for OpenCV
+import numpy as np
+from numpy.typing import NDArray
+
+# z-buffer value of color pixels no depth pixel landed on
+_NO_DEPTH = np.iinfo(np.uint16).max
+
+
+def calib_to_numpy(calib: Any) -> dict[str, Any]:
+    """Converts a `PercipioCalibData` to numpy: intrinsic (3, 3), extrinsic (4, 4), distortion."""
+    return {
+        "width": int(calib.Width()),
+        "height": int(calib.Height()),
+        "intrinsic": np.asarray(list(calib.Intrinsic()), dtype=np.float64).reshape(3, 3),
+        "extrinsic": np.asarray(list(calib.Extrinsic()), dtype=np.float64).reshape(4, 4),
+        "distortion": np.asarray(list(calib.Distortion()), dtype=np.float64),
+    }
+
+
+def calib_from_lists(calib: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of storing a `calib_to_numpy()` result as JSON lists."""
+    return {
+        "width": int(calib["width"]),
+        "height": int(calib["height"]),
+        "intrinsic": np.asarray(calib["intrinsic"], dtype=np.float64).reshape(3, 3),
+        "extrinsic": np.asarray(calib["extrinsic"], dtype=np.float64).reshape(4, 4),
+        "distortion": np.asarray(calib["distortion"], dtype=np.float64),
+    }
+
+
+def scale_intrinsic(intrinsic: NDArray[Any], calib_size: tuple[int, int], size: tuple[int, int]) -> NDArray[Any]:
+    """Rescales an intrinsic matrix from the calibration resolution to an image resolution (w, h)."""
+    k = intrinsic.copy()
+    k[0] *= size[0] / calib_size[0]
+    k[1] *= size[1] / calib_size[1]
+    return k
+
+
+class DepthRegistration:
+    """
+    Aligns depth and color images with tables precomputed from the calibration.
+
+    Args:
+        depth_calib: Depth calibration from `calib_to_numpy()`.
+        color_calib: Color calibration from `calib_to_numpy()`, its extrinsic maps depth camera
+            coordinates to color camera coordinates (mm).
+        depth_size: Depth image resolution (w, h).
+        color_size: Color image resolution (w, h).
+        depth_scale: Depth unit in mm, from `DeviceReadCalibDepthScaleUnit`.
+        tables: Optional `tables` of an earlier instance with the same arguments, e.g. loaded from
+            a cache, instead of computing them.
+    """
+
+    def __init__(
+        self,
+        depth_calib: dict[str, Any],
+        color_calib: dict[str, Any],
+        depth_size: tuple[int, int],
+        color_size: tuple[int, int],
+        depth_scale: float = 1.0,
+        tables: tuple[NDArray[Any], NDArray[Any]] | None = None,
+    ):
+        self.depth_size = depth_size
+        self.color_size = color_size
+        self.depth_scale = depth_scale
+
+        # When the color image is k times larger than the depth image, depth is splatted on a color
+        # grid k times smaller and upscaled, so the registered depth is dense instead of 1 / k^2.
+        self.upscale = max(1, min(color_size[0] // depth_size[0], color_size[1] // depth_size[1]))
+        self.grid_size = (color_size[0] // self.upscale, color_size[1] // self.upscale)
+
+        if tables is not None:
+            self._a, self._b = tables
+        else:
+            self._a, self._b = self._build_tables(depth_calib, color_calib)
+
+        # per frame scratch buffers
+        w, h = depth_size
+        n = w * h
+        self._z = np.empty(n, dtype=np.float32)
+        self._p = np.empty((3, n), dtype=np.float32)
+        self._uc = np.empty(n, dtype=np.float32)
+        self._vc = np.empty(n, dtype=np.float32)
+        self._valid = np.empty(n, dtype=bool)
+        self._tmp = np.empty(n, dtype=bool)
+        self._grid = np.empty((self.grid_size[1], self.grid_size[0]), dtype=np.uint16)
+
+    @property
+    def tables(self) -> tuple[NDArray[np.float32], NDArray[np.float32]]:
+        """The precomputed projection tables, see the `tables` argument."""
+        return self._a, self._b
+
+    def _build_tables(
+        self, depth_calib: dict[str, Any], color_calib: dict[str, Any]
+    ) -> tuple[NDArray[np.float32], NDArray[np.float32]]:
+        k_depth = scale_intrinsic(
+            depth_calib["intrinsic"], (depth_calib["width"], depth_calib["height"]), self.depth_size
+        )
+        k_color = scale_intrinsic(
+            color_calib["intrinsic"], (color_calib["width"], color_calib["height"]), self.grid_size
+        )
+        extrinsic = color_calib["extrinsic"]
+
+        # rays of all depth pixels, rotated and projected into the color camera: a color pixel in
+        # homogeneous coordinates is then z * a + b for a depth pixel at depth z (mm)
+        w, h = self.depth_size
+        u, v = np.meshgrid(np.arange(w, dtype=np.float64), np.arange(h, dtype=np.float64))
+        pixels = np.stack([u.ravel(), v.ravel(), np.ones(w * h)])
+        rays = np.linalg.inv(k_depth) @ pixels
+        a = (k_color @ extrinsic[:3, :3] @ rays).astype(np.float32)
+        b = (k_color @ extrinsic[:3, 3]).astype(np.float32)[:, None]
+        return a, b
+
+    def _project(self, depth: NDArray[Any]) -> tuple[NDArray[Any], NDArray[Any], NDArray[Any]]:
+        """
+        Returns the depth pixels that land in the color image: their index, index on the color
+        grid (`grid_size`) and z in the color camera frame (mm).
+        """
+        cw, ch = self.grid_size
+        z = self._z
+        np.multiply(depth.reshape(-1), self.depth_scale, out=z, casting="unsafe")
+        np.multiply(self._a, z, out=self._p)
+        self._p += self._b
+
+        valid, tmp = self._valid, self._tmp
+        np.greater(z, 0, out=valid)
+        # points behind the color camera are not seen by it
+        np.greater(self._p[2], 0, out=tmp)
+        valid &= tmp
+        # avoid dividing by zero, invalid pixels are dropped below anyway
+        self._p[2][~valid] = 1.0
+        np.divide(self._p[0], self._p[2], out=self._uc)
+        np.divide(self._p[1], self._p[2], out=self._vc)
+        self._uc += 0.5
+        self._vc += 0.5
+        for coord, size in ((self._uc, cw), (self._vc, ch)):
+            np.greater_equal(coord, 0, out=tmp)
+            valid &= tmp
+            np.less(coord, size, out=tmp)
+            valid &= tmp
+
+        src = np.flatnonzero(valid)
+        dst = self._vc[src].astype(np.intp) * cw + self._uc[src].astype(np.intp)
+        # the third homogeneous coordinate is z in the color camera frame
+        return src, dst, self._p[2][src]
+
+    def depth_to_color(self, depth: NDArray[Any], out: NDArray[Any] | None = None) -> NDArray[np.uint16]:
+        """
+        Registers a depth image to the color image.
+
+        Args:
+            depth: Raw depth image of `depth_size`, shape (h, w) or (h, w, 1).
+            out: Optional (color_h, color_w, 1) uint16 array to write into.
+
+        Returns:
+            Depth in mm seen from the color camera, shape (color_h, color_w, 1), 0 where unknown.
+            When several depth pixels land on the same color pixel the nearest one is kept.
+        """
+        cw, ch = self.color_size
+        if out is None:
+            out = np.empty((ch, cw, 1), dtype=np.uint16)
+        flat = self._grid.reshape(-1)
+        flat.fill(_NO_DEPTH)
+
+        _, dst, z = self._project(depth)
+        z = (z + 0.5).astype(np.uint16)
+        # z-buffer: the nearest point wins on collisions (occlusions), whatever the write order
+        np.minimum.at(flat, dst, z)
+        flat[flat == _NO_DEPTH] = 0
+
+        if self.grid_size == self.color_size:
+            out[..., 0] = self._grid
+        else:
+            cv2.resize(self._grid, self.color_size, dst=out.reshape(ch, cw), interpolation=cv2.INTER_NEAREST)
+        return out
+
+    def color_to_depth(
+        self, color: NDArray[Any], depth: NDArray[Any], out: NDArray[Any] | None = None
+    ) -> NDArray[Any]:
+        """
+        Registers a color image to the depth image.
+
+        Args:
+            color: Color image of `color_size`, shape (h, w, c).
+            depth: Raw depth image of `depth_size` taken with it.
+            out: Optional (depth_h, depth_w, c) array to write into.
+
+        Returns:
+            The color of every depth pixel, black where the depth is unknown or out of view.
+        """
+        w, h = self.depth_size
+        if out is None:
+            out = np.empty((h, w) + color.shape[2:], dtype=color.dtype)
+        flat_out = out.reshape(h * w, -1)
+        flat_out.fill(0)
+
+        src, dst, _ = self._project(depth)
+        if self.upscale > 1:
+            # grid index -> full resolution color index
+            gw = self.grid_size[0]
+            dst = (dst // gw) * self.upscale * self.color_size[0] + (dst % gw) * self.upscale
+        flat_out[src] = color.reshape(-1, flat_out.shape[1])[dst]
+        return out
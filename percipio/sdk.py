@@ -0,0 +1,191 @@
+"""
+Lazy loading of the Percipio SDK.
+
+`pcammls` (a ~13k line SWIG wrapper) and `libtycam.so` are only loaded on the first call to
+`load_pcammls()`, i.e. on first device use, and are resolved relative to this package instead of
+relying on PYTHONPATH/LD_LIBRARY_PATH. Importing `percipio` therefore stays cheap for tools that
+never open a camera.
+
+All cameras of a process share one `PercipioSDK` instance (`shared_sdk()`) and one device
+enumeration (`list_devices()`), so bringing up N cameras enumerates the bus once. The singletons
+are built under `SDK_LOCK`, so cameras connecting from several threads still get the same
+instances.
+"""
+
+import ctypes
+import glob
+import ipaddress
+import logging
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Serializes building the singletons below and Open/Close/enumeration on the shared instance, so
+# a camera opening or closing or a re-enumeration does not race with other cameras.
+SDK_LOCK = threading.RLock()
+
+_pcammls: ModuleType | None = None
+_event_class: type | None = None
+_sdk: Any = None
+_device_event: Any = None
+_devices: list[Any] | None = None
+
+
+def load_pcammls() -> ModuleType:
+    """Loads libtycam and the `pcammls` wrapper once and returns the `pcammls` module."""
+    global _pcammls
+    if _pcammls is not None:
+        return _pcammls
+    with SDK_LOCK:
+        if _pcammls is None:
+            _pcammls = _load_pcammls()
+        return _pcammls
+
+
+def _load_pcammls() -> ModuleType:
+    # Preload the versioned library (its soname) globally so the `_pcammls` extension resolves
+    # it without LD_LIBRARY_PATH. Fall back to the dynamic linker search path if it is missing.
+    libs = sorted(glob.glob(os.path.join(PACKAGE_DIR, "libtycam.so.*"))) or glob.glob(
+        os.path.join(PACKAGE_DIR, "libtycam.so")
+    )
+    if libs:
+        ctypes.CDLL(libs[-1], mode=ctypes.RTLD_GLOBAL)
+
+    # pcammls imports `_pcammls` as a top-level module when imported as one
+    if PACKAGE_DIR not in sys.path:
+        sys.path.append(PACKAGE_DIR)
+    import pcammls
+
+    logger.debug(f"Loaded Percipio SDK from {PACKAGE_DIR}")
+    return pcammls
+
+
+def device_event_class() -> type:
+    """Returns the device event handler class, defined on first use since it subclasses the SDK."""
+    global _event_class
+    if _event_class is not None:
+        return _event_class
+    with SDK_LOCK:
+        if _event_class is None:
+            _event_class = _define_device_event_class(load_pcammls())
+        return _event_class
+
+
+def _define_device_event_class(pcammls: ModuleType) -> type:
+
+    class PythonPercipioDeviceEvent(pcammls.DeviceEvent):
+        Offline = False
+
+        def __init__(self):
+            pcammls.DeviceEvent.__init__(self)
+            # the SDK has a single event handler for all devices, offline devices are tracked
+            # per handle
+            self.offline_handles: set[int] = set()
+
+        def run(self, handle, eventID):
+            if eventID == pcammls.TY_EVENT_DEVICE_OFFLINE:
+                print("=== Event Callback: Device Offline!")
+                self.Offline = True
+                self.offline_handles.add(int(handle))
+            return 0
+
+        def IsOffline(self, handle=None):
+            if handle is None:
+                return self.Offline
+            return int(handle) in self.offline_handles
+
+        def Reset(self, handle):
+            """Forgets that `handle` went offline, handles are reused after Close."""
+            self.offline_handles.discard(int(handle))
+
+    return PythonPercipioDeviceEvent
+
+
+def shared_sdk() -> Any:
+    """Returns the process-wide `PercipioSDK` instance, with its device event handler registered."""
+    global _sdk
+    if _sdk is not None:
+        return _sdk
+    with SDK_LOCK:
+        if _sdk is None:
+            cl = load_pcammls().PercipioSDK()
+            cl.DeviceRegiststerCallBackEvent(shared_device_event())
+            _sdk = cl
+        return _sdk
+
+
+def shared_device_event() -> Any:
+    """Returns the device event handler registered on `shared_sdk()`, see `IsOffline(handle)`."""
+    global _device_event
+    if _device_event is not None:
+        return _device_event
+    with SDK_LOCK:
+        if _device_event is None:
+            _device_event = device_event_class()()
+        return _device_event
+
+
+def list_devices(refresh: bool = False) -> list[Any]:
+    """
+    Returns the attached devices. The bus is enumerated on the first call only, `refresh=True`
+    enumerates again (e.g. after a device was plugged in or came back online).
+    """
+    global _devices
+    with SDK_LOCK:
+        if _devices is None or refresh:
+            #枚举所有已连接的设备，结果在进程内缓存
+            _devices = list(shared_sdk().ListDevice())
+        return _devices
+
+
+def device_ip(dev: Any) -> str | None:
+    """Returns the IP address of a network device, None for USB devices."""
+    try:
+        ip = dev.get_netinfo().ip()
+    except Exception:
+        return None
+    return ip or None
+
+
+def find_device(serial_number_or_ip: str | None) -> Any:
+    """
+    Returns the enumerated device with this serial number or IP address, or the only attached
+    device for None. Enumerates again once if the device is not in the cached enumeration.
+
+    Raises:
+        ValueError: If no device, or for None several devices, match.
+    """
+    is_ip = False
+    if serial_number_or_ip is not None:
+        try:
+            ipaddress.ip_address(serial_number_or_ip)
+            is_ip = True
+        except ValueError:
+            pass
+
+    def match(devices: list[Any]) -> list[Any]:
+        if serial_number_or_ip is None:
+            return devices
+        if is_ip:
+            return [d for d in devices if device_ip(d) == serial_number_or_ip]
+        return [d for d in devices if d.id == serial_number_or_ip]
+
+    found = match(list_devices())
+    if not found:
+        found = match(list_devices(refresh=True))
+
+    if not found:
+        what = "" if serial_number_or_ip is None else f" with serial number or IP {serial_number_or_ip}"
+        raise ValueError(f"No Percipio camera found{what}.")
+    if len(found) > 1:
+        raise ValueError(
+            f"Several Percipio cameras found ({', '.join(d.id for d in found)}), "
+            "set `serial_number_or_ip` to select one."
+        )
+    return found[0]
@@ -0,0 +1,62 @@
+"""
+Lens undistortion of Percipio color frames with precomputed remap tables.
+
+`build_undistort_maps()` turns the calibration into fixed point `cv2.remap` tables once. The frame
+rotation is folded into the tables, so undistorting and rotating a frame is a single remap pass
+instead of a per frame `DeviceStreamDoUndistortion` followed by `cv2.rotate`. The camera
+persists the tables in its `DeviceCache`, so reconnecting skips building them.
+"""
+
+from typing import Any
+
+import cv2  # type: ignore  # TODO: add type stubs for OpenCV
+import numpy as np
+from numpy.typing import NDArray
+
+from percipio.registration import scale_intrinsic
+
+
+def build_undistort_maps(
+    calib: dict[str, Any],
+    rectified_intrinsic: NDArray[Any],
+    size: tuple[int, int],
+    rotation: int | None = None,
+    out_size: tuple[int, int] | None = None,
+    crop: tuple[int, int, int, int] | None = None,
+) -> tuple[NDArray[np.int16], NDArray[np.uint16]]:
+    """
+    Builds the remap tables undistorting (and cropping, resizing, rotating) images of one resolution.
+
+    Args:
+        calib: Color calibration from `calib_to_numpy()`.
+        rectified_intrinsic: (3, 3) intrinsic of the undistorted image at the calibration
+            resolution, from `DeviceReadRectifiedIntrData`.
+        size: Image resolution (w, h).
+        rotation: Optional cv2 rotation code applied after undistortion.
+        out_size: Resolution (w, h) of the undistorted image before rotation, defaults to `size`.
+            The same remap pass then also resizes.
+        crop: Optional region (top, left, height, width) of the undistorted image at `size`, in
+            pixels, that is resized to `out_size`.
+
+    Returns:
+        tuple: `cv2.remap` tables in fixed point format (CV_16SC2 and the interpolation table),
+        shaped like the rotated output image.
+    """
+    out_size = size if out_size is None else out_size
+    calib_size = (calib["width"], calib["height"])
+    k = scale_intrinsic(calib["intrinsic"], calib_size, size)
+    if crop is None:
+        new_k = scale_intrinsic(rectified_intrinsic, calib_size, out_size)
+    else:
+        # the output is the crop of the undistorted image at `size`, scaled to `out_size`
+        top, left, crop_h, crop_w = crop
+        new_k = scale_intrinsic(rectified_intrinsic, calib_size, size)
+        new_k[0, 2] -= left
+        new_k[1, 2] -= top
+        new_k = scale_intrinsic(new_k, (crop_w, crop_h), out_size)
+    map_x, map_y = cv2.initUndistortRectifyMap(k, calib["distortion"], None, new_k, out_size, cv2.CV_32FC1)
+    if rotation is not None:
+        # rotate(undistort(img))[p] = undistort(img)[rotation^-1(p)], i.e. the rotated table
+        map_x = cv2.rotate(map_x, rotation)
+        map_y = cv2.rotate(map_y, rotation)
+    return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
@@ -199,6 +199,7 @@ def create_camera_instance(cam_meta: dict[str, Any]) -> dict[str, Any] | None:
             instance = RealSenseCamera(rs_config)
         elif cam_type == "Percipio":
             pc_config = PercipioCameraConfig(
+                serial_number_or_ip=cam_id,
                 use_depth=False,
                 registration_mode=False,
                 color_mode=ColorMode.RGB,
@@ -0,0 +1,272 @@
+"""
+In-process metrics for the robot and camera hot paths.
+
+Provides counters and fixed-bucket latency histograms (p50/p95/p99/max) that can be recorded from
+any thread without taking a lock: every thread writes into its own shard, created on its first
+record, and `snapshot()` sums the shards. A snapshot may therefore miss records that are in flight
+while it is taken, which is fine for monitoring.
+
+Example:
+
+```python
+from zprobot_metrics import REGISTRY, MetricsDumper
+
+decode_ms = REGISTRY.histogram("percipio.decode_ms")
+start = time.perf_counter()
+...
+decode_ms.observe_since(start)
+
+print(REGISTRY.snapshot())
+MetricsDumper("/tmp/zprobot_metrics.prom", interval_s=10, fmt="prometheus").start()
+```
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from bisect import bisect_left
+from threading import Event, Lock, Thread, local
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets (ms), roughly log spaced from 50 us to 10 s. Values above the
+# last bound land in an overflow bucket.
+LATENCY_BUCKETS_MS = (
+    0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 50.0, 75.0,
+    100.0, 150.0, 200.0, 300.0, 500.0, 1000.0, 2000.0, 5000.0, 10000.0,
+)  # fmt: skip
+
+
+class _Sharded:
+    """Base class handing every thread its own shard of a metric."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._local = local()
+        self._shards: list = []
+        self._shards_lock = Lock()
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+            # only taken once per thread
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+
+class Counter(_Sharded):
+    """Monotonic event counter."""
+
+    def _new_shard(self) -> list[int]:
+        return [0]
+
+    def inc(self, n: int = 1) -> None:
+        self._shard()[0] += n
+
+    @property
+    def value(self) -> int:
+        return sum(shard[0] for shard in list(self._shards))
+
+
+class _HistogramShard:
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self, num_buckets: int):
+        self.counts = [0] * num_buckets
+        self.total = 0.0
+        self.max = 0.0
+
+
+class LatencyHistogram(_Sharded):
+    """
+    Fixed-bucket latency histogram in milliseconds.
+
+    Percentiles are interpolated linearly inside the bucket they fall in, so they are accurate to
+    the bucket resolution.
+    """
+
+    def __init__(self, name: str, bounds_ms: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        super().__init__(name)
+        self.bounds_ms = bounds_ms
+
+    def _new_shard(self) -> _HistogramShard:
+        return _HistogramShard(len(self.bounds_ms) + 1)
+
+    def observe(self, value_ms: float) -> None:
+        shard = self._shard()
+        shard.counts[bisect_left(self.bounds_ms, value_ms)] += 1
+        shard.total += value_ms
+        if value_ms > shard.max:
+            shard.max = value_ms
+
+    def observe_since(self, start: float) -> float:
+        """Records the time elapsed since `start` (a time.perf_counter() value), returns it in ms."""
+        value_ms = (time.perf_counter() - start) * 1e3
+        self.observe(value_ms)
+        return value_ms
+
+    def summary(self) -> dict[str, float]:
+        counts = [0] * (len(self.bounds_ms) + 1)
+        total = 0.0
+        max_ms = 0.0
+        for shard in list(self._shards):
+            for i, c in enumerate(shard.counts):
+                counts[i] += c
+            total += shard.total
+            max_ms = max(max_ms, shard.max)
+
+        n = sum(counts)
+        summary = {"count": n, "mean_ms": total / n if n else 0.0, "max_ms": max_ms}
+        for q in (50, 95, 99):
+            summary[f"p{q}_ms"] = self._percentile(counts, n, q / 100, max_ms)
+        summary["buckets"] = counts
+        return summary
+
+    def _percentile(self, counts: list[int], n: int, q: float, max_ms: float) -> float:
+        if n == 0:
+            return 0.0
+        rank = q * n
+        cum = 0
+        for i, c in enumerate(counts):
+            if c and cum + c >= rank:
+                lo = self.bounds_ms[i - 1] if i > 0 else 0.0
+                hi = self.bounds_ms[i] if i < len(self.bounds_ms) else max_ms
+                return min(lo + (hi - lo) * (rank - cum) / c, max_ms)
+            cum += c
+        return max_ms
+
+
+class MetricsRegistry:
+    """Named counters and histograms, created on first use."""
+
+    def __init__(self):
+        self._counters: dict[str, Counter] = {}
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = Lock()
+
+    def counter(self, name: str) -> Counter:
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name)
+            return self._counters[name]
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = LatencyHistogram(name)
+            return self._histograms[name]
+
+    def snapshot(self) -> dict[str, dict]:
+        """Returns the current value of every counter and the summary of every histogram."""
+        with self._lock:
+            counters = list(self._counters.values())
+            histograms = list(self._histograms.values())
+        return {
+            "timestamp": time.time(),
+            "counters": {c.name: c.value for c in counters},
+            "histograms": {h.name: h.summary() for h in histograms},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Renders the registry in the Prometheus text exposition format."""
+        with self._lock:
+            counters = list(self._counters.values())
+            histograms = list(self._histograms.values())
+
+        lines = []
+        for c in counters:
+            name = _prometheus_name(c.name)
+            lines += [f"# TYPE {name} counter", f"{name} {c.value}"]
+        for h in histograms:
+            name = _prometheus_name(h.name)
+            summary = h.summary()
+            lines.append(f"# TYPE {name} histogram")
+            cum = 0
+            for bound, count in zip(h.bounds_ms, summary["buckets"], strict=False):
+                cum += count
+                lines.append(f'{name}_bucket{{le="{bound}"}} {cum}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {summary["count"]}')
+            lines.append(f"{name}_sum {summary['mean_ms'] * summary['count']}")
+            lines.append(f"{name}_count {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+# Process-wide registry used by the drivers
+REGISTRY = MetricsRegistry()
+
+
+def snapshot() -> dict[str, dict]:
+    return REGISTRY.snapshot()
+
+
+class MetricsDumper:
+    """
+    Periodically writes a registry to a file, as JSON or Prometheus text.
+
+    The file is replaced atomically, so it can be scraped (e.g. by the node_exporter textfile
+    collector) while it is being rewritten.
+
+    Args:
+        path: Output file.
+        interval_s: Time between two dumps.
+        fmt: "json" or "prometheus".
+        registry: Registry to dump, defaults to the process-wide one.
+    """
+
+    def __init__(self, path: str, interval_s: float = 10.0, fmt: str = "json", registry: MetricsRegistry = REGISTRY):
+        if fmt not in ("json", "prometheus"):
+            raise ValueError(f"`fmt` is expected to be 'json' or 'prometheus', but {fmt} is provided.")
+        self.path = path
+        self.interval_s = interval_s
+        self.fmt = fmt
+        self.registry = registry
+
+        self.thread: Thread | None = None
+        self.stop_event: Event | None = None
+
+    def dump(self) -> None:
+        text = self.registry.to_json() if self.fmt == "json" else self.registry.to_prometheus()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def _dump_loop(self) -> None:
+        while not self.stop_event.wait(self.interval_s):
+            try:
+                self.dump()
+            except Exception as e:
+                logger.warning(f"Error dumping metrics to {self.path}: {e}")
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event = Event()
+        self.thread = Thread(target=self._dump_loop, args=(), name="MetricsDumper_dump_loop")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stops the dump thread and writes a final dump."""
+        if self.stop_event is not None:
+            self.stop_event.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        self.thread = None
+        self.stop_event = None
+        self.dump()